@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""Batched Gemini abuse classification: many news items per request, JSON verdicts back."""
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import threading
+
+from gemini_scheduler import MODEL_NAME, get_scheduler
+from news_cache import DiskCache, cache_path
+
+logger = logging.getLogger(__name__)
+
+ABUSE_BATCH_SIZE = 20
+MAX_CONCURRENT_BATCHES = 4
+BATCH_TIMEOUT = 60
+# Deadline of a single-item request (items a batch reply skipped or garbled are retried one by one)
+ITEM_TIMEOUT = 30
+
+# Cached verdicts expire after a week; the cache keeps at most this many items
+VERDICT_TTL = 7 * 24 * 3600
+VERDICT_CACHE_SIZE = 50000
+
+NOT_ABUSIVE = (False, [])
+
+_verdict_cache = None
+_cache_lock = threading.Lock()
+
+
+def build_batch_prompt(batch):
+    """Build one prompt covering every ``(item_id, text)`` pair in the batch."""
+    items_json = json.dumps([{"id": item_id, "text": text} for item_id, text in batch], ensure_ascii=False)
+    return f"""Analyze each of the following news items for potentially abusive, harmful, or toxic content.
+    Identify any language that could be considered offensive, threatening, hateful, or inappropriate.
+
+    Items (JSON array of objects with "id" and "text"):
+    {items_json}
+
+    Respond with JSON only, in this exact shape, with one result per input id:
+    {{"results": [{{"id": "<id>", "is_abusive": true|false, "abusive_elements": ["<word or phrase>", ...], "severity": "Low|Medium|High"}}]}}
+    """
+
+
+def get_verdict_cache():
+    """Return the persistent cache of AI verdicts."""
+    global _verdict_cache
+    if _verdict_cache is None:
+        with _cache_lock:
+            if _verdict_cache is None:
+                _verdict_cache = DiskCache(cache_path("abuse_verdicts.sqlite"), ttl=VERDICT_TTL,
+                                           max_entries=VERDICT_CACHE_SIZE)
+    return _verdict_cache
+
+
+def prompt_version():
+    """Short hash of the model and prompt template, so changing either invalidates cached verdicts."""
+    template = build_batch_prompt([("{id}", "{text}")])
+    return hashlib.sha1(f"{MODEL_NAME}\n{template}".encode()).hexdigest()[:12]
+
+
+def parse_batch_response(text):
+    """Parse the model's JSON reply into ``{item_id: (is_abusive, abusive_elements)}``."""
+    # Tolerate replies wrapped in a markdown code fence
+    text = re.sub(r'^```(?:json)?\s*|\s*```$', '', text.strip())
+    data = json.loads(text)
+    results = data.get("results", []) if isinstance(data, dict) else data
+
+    verdicts = {}
+    for result in results:
+        if not isinstance(result, dict) or "id" not in result:
+            continue
+        elements = result.get("abusive_elements") or []
+        if isinstance(elements, str):
+            elements = [e.strip() for e in elements.split(',')]
+        is_abusive = result.get("is_abusive")
+        if isinstance(is_abusive, str):
+            is_abusive = is_abusive.strip().lower() in ("yes", "true")
+        verdicts[str(result["id"])] = (bool(is_abusive), [str(e).strip() for e in elements if str(e).strip()])
+    return verdicts
+
+
+def batch_output_tokens(batch_size):
+    """Reply token budget for a batch of ``batch_size`` items."""
+    return 150 * batch_size + 100
+
+
+def classify_batch(batch, timeout=BATCH_TIMEOUT):
+    """Classify one batch of ``(item_id, text)`` pairs with a single Gemini request."""
+    analysis_text = get_scheduler().generate_text(
+        build_batch_prompt(batch),
+        max_output_tokens=batch_output_tokens(len(batch)),
+        temperature=0.2,
+        response_mime_type="application/json",
+        timeout=timeout
+    )
+    return parse_batch_response(analysis_text)
+
+
+async def classify_item_async(item_id, text, timeout=ITEM_TIMEOUT):
+    """
+    Classify one text with its own request. Must be awaited on the scheduler's loop.
+
+    Returns:
+        ``(is_abusive, abusive_elements)``, or None if the reply has no verdict for the item
+    """
+    reply = await get_scheduler().generate_text_async(
+        build_batch_prompt([(item_id, text)]),
+        max_output_tokens=batch_output_tokens(1),
+        temperature=0.2,
+        response_mime_type="application/json",
+        timeout=timeout
+    )
+    return parse_batch_response(reply).get(item_id)
+
+
+async def classify_items_async(items, timeout=ITEM_TIMEOUT):
+    """
+    Classify ``(item_id, text)`` pairs with one request each, all sent at once.
+
+    The scheduler's in-flight and rate limits bound the burst, which otherwise
+    takes about as long as its slowest request.
+
+    Returns:
+        One result of classify_item_async per item; a failed item's slot holds its exception
+    """
+    return await asyncio.gather(*(classify_item_async(item_id, text, timeout) for item_id, text in items),
+                                return_exceptions=True)
+
+
+def classify_abuse_batch(texts, batch_size=ABUSE_BATCH_SIZE, max_concurrency=MAX_CONCURRENT_BATCHES,
+                         on_error=None, use_cache=True):
+    """
+    Classify many texts for abusive content with as few Gemini requests as possible.
+
+    Args:
+        texts: Mapping of item id (the news hash) to the text to analyze
+        batch_size: Number of items packed into each request
+        max_concurrency: Maximum number of this call's requests in flight at once
+            (the shared scheduler's own limits still apply)
+        on_error: Optional callable receiving an error message per failed batch.
+            It is called from the calling thread after all batches finish, so it
+            may safely be a Streamlit function such as ``st.warning``.
+        use_cache: Serve and store verdicts through the persistent verdict cache
+
+    Returns:
+        Dict mapping every item id to ``(is_abusive, abusive_elements)``. Items
+        a batch reply left out or garbled are sent again one per request
+        (classify_items_async); items of failed requests are reported as not abusive.
+    """
+    items = [(str(item_id), text) for item_id, text in texts.items()]
+    if not items:
+        return {}
+
+    verdicts = {}
+    cache = get_verdict_cache() if use_cache else None
+    if cache is not None:
+        version = prompt_version()
+        cached = cache.get_many(f"{item_id}:{version}" for item_id, _ in items)
+        for item_id, _ in items:
+            hit = cached.get(f"{item_id}:{version}")
+            if hit is not None:
+                verdicts[item_id] = (hit[0], hit[1])
+
+    pending = [item for item in items if item[0] not in verdicts]
+    batch_size = max(1, batch_size)
+    batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+
+    errors = []
+    if batches:
+        fresh = {}
+        retry = []
+        # Every batch is sent at once from the scheduler's event loop
+        replies = get_scheduler().map_text(
+            [build_batch_prompt(batch) for batch in batches],
+            max_concurrency=max(1, max_concurrency),
+            max_output_tokens=batch_output_tokens(batch_size),
+            temperature=0.2,
+            response_mime_type="application/json",
+            timeout=BATCH_TIMEOUT
+        )
+        for batch, reply in zip(batches, replies):
+            if isinstance(reply, Exception):
+                logger.warning(f"Error classifying abuse batch: {reply}")
+                errors.append(str(reply))
+                continue
+            try:
+                result = parse_batch_response(reply)
+            except (ValueError, TypeError, AttributeError) as e:
+                # Usually a reply cut off at the token limit; its items are retried one by one
+                logger.warning(f"Unreadable abuse batch reply: {e}")
+                result = {}
+            for item_id, text in batch:
+                if item_id in result:
+                    fresh[item_id] = result[item_id]
+                else:
+                    retry.append((item_id, text))
+        if retry:
+            results = get_scheduler().run(classify_items_async(retry))
+            for (item_id, _), result in zip(retry, results):
+                if isinstance(result, Exception):
+                    logger.warning(f"Error classifying abuse item {item_id}: {result}")
+                    errors.append(str(result))
+                elif result is not None:
+                    fresh[item_id] = result
+        # Items still without a verdict are not cached, so they are retried next time
+        verdicts.update(fresh)
+        if cache is not None and fresh:
+            cache.set_many({f"{item_id}:{version}": list(verdict) for item_id, verdict in fresh.items()})
+
+    if on_error:
+        # Retried items of one failing burst tend to fail with the same message
+        for error in dict.fromkeys(errors):
+            on_error(f"Error analyzing content for abuse: {error}")
+    return {item_id: verdicts.get(item_id, NOT_ABUSIVE) for item_id, _ in items}
@@ -1,36 +1,50 @@
 # -*- coding: utf-8 -*-
 import streamlit as st
-from bs4 import BeautifulSoup
-import requests
-import feedparser
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
-from io import BytesIO
-import re
-import hashlib
+from concurrent.futures import ThreadPoolExecutor
+import bisect
 from datetime import datetime, timedelta
 import google.generativeai as genai
-from google.generativeai import GenerativeModel
 import os
+import time
 from dotenv import load_dotenv
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from news_highlight import highlight_abusive_words
+from news_pipeline import (
+    news_sort_key, merge_news,
+    iter_rss_news, scrape_sarkari_pariksha, apply_ai_abuse_analysis, add_article_bodies,
+)
+from news_seen import get_seen_filter
+from news_store import NewsStore, STORE_PATH
+from gemini_scheduler import get_scheduler
+from news_timing import NO_TIMINGS, StageTimings
 
 # Load environment variables
 load_dotenv()
 
+st.set_page_config(
+    page_title="Advanced News Scraper",
+    page_icon="🌐",
+    layout="wide"
+)
+
 # Configure API keys
 gemini_api_key = os.getenv("GEMINI_API_KEY")
 
+@st.cache_resource(show_spinner="Connecting to Gemini...")
+def init_gemini(api_key):
+    """Configure Gemini and run the health check once per process.
+
+    Failures raise, and Streamlit does not cache exceptions, so a failed check is retried on the next rerun.
+    """
+    genai.configure(api_key=api_key)
+    # list_models is lazy; pull the first page so the key and network are actually checked
+    next(iter(genai.list_models(page_size=1, request_options={'timeout': 10})), None)
+    return True
+
 # Initialize APIs
 gemini_initialized = False
 if gemini_api_key:
     try:
-        genai.configure(api_key=gemini_api_key)
-        models = genai.list_models()  # Simple check
-        gemini_initialized = True
+        gemini_initialized = init_gemini(gemini_api_key)
     except ImportError:
         st.error("The 'google-generativeai' library is not installed. Please run 'pip install google-generativeai' in your terminal.", icon="🚨")
     except Exception as e:
@@ -38,458 +52,164 @@ if gemini_api_key:
 else:
     st.warning("Gemini API key not found. Please set the GEMINI_API_KEY environment variable in your .env file to enable AI analysis.", icon="⚠️")
 
-st.set_page_config(
-    page_title="Advanced News Scraper",
-    page_icon="🌐",
-    layout="wide"
-)
+def analyze_news(news_items):
+    """Analyze news using the Gemini AI model, reusing a cached analysis of the same items.
 
-# Define abusive keywords to detect
-# Define abusive keywords to detect in multiple languages
-ABUSIVE_KEYWORDS = {
-    "en": [
-        "kill", "murder", "assault", "attack", "hate", "violent", "terror",
-        "bomb", "shoot", "racist", "abuse", "threat", "harass", "genocide",
-        "extremist", "rape", "torture", "massacre", "suicide", "riot",
-        "hostage", "kidnap", "lynch", "brutal", "bloodshed", "slaughter",
-        "militant", "radicalize", "jihad", "supremacist"
-    ],
-    
-    "hi": [
-        # Violence related
-        "हत्या", "मारना", "हमला", "हिंसा", "आतंक", "बम", "गोली", 
-        # Hate speech related
-        "नफरत", "नस्लवादी", "दुर्व्यवहार", "धमकी", "परेशान", 
-        # More violent terms
-        "बलात्कार", "यातना", "नरसंहार", "आत्महत्या", "दंगा",
-        # Threats and abuse
-        "बंधक", "अपहरण", "लिंचिंग", "क्रूर", "खून", "क़त्ल",
-        # Extremism related
-        "आतंकवादी", "चरमपंथी", "जिहाद", "हिंसक", "उग्रवादी"
-    ],
+    Returns (analysis_text, cached_at); see news_analysis.analyze_news.
+    """
+    from news_analysis import analyze_news as run_analysis
     
-    "kn": [
-        # Violence related
-        "ಕೊಲೆ", "ಹತ್ಯೆ", "ದಾಳಿ", "ಹಿಂಸೆ", "ಭಯೋತ್ಪಾದನೆ", "ಬಾಂಬ್", "ಗುಂಡು",
-        # Hate speech related
-        "ದ್ವೇಷ", "ತಾರತಮ್ಯ", "ದುರುಪಯೋಗ", "ಬೆದರಿಕೆ", "ಕಿರುಕುಳ",
-        # More violent terms
-        "ಅತ್ಯಾಚಾರ", "ಚಿತ್ರಹಿಂಸೆ", "ಸಾಮೂಹಿಕ ಹತ್ಯೆ", "ಆತ್ಮಹತ್ಯೆ", "ಗಲಭೆ",
-        # Threats and abuse
-        "ಒತ್ತೆ", "ಅಪಹರಣ", "ಲಿಂಚಿಂಗ್", "ಕ್ರೂರ", "ರಕ್ತಪಾತ", "ಕೊಲೆ",
-        # Extremism related
-        "ಉಗ್ರಗಾಮಿ", "ತೀವ್ರವಾದಿ", "ಜಿಹಾದ್", "ಹಿಂಸಾತ್ಮಕ", "ಭಯೋತ್ಪಾದಕ"
-    ]
-}
-
-# Define news sources
-NEWS_SOURCES = [
-    {"name": "CNN", "rss": "http://rss.cnn.com/rss/cnn_topstories.rss", "language": "en"},
-    {"name": "BBC", "rss": "http://feeds.bbci.co.uk/news/rss.xml", "language": "en"},
-    {"name": "Reuters", "rss": "http://feeds.reuters.com/reuters/topNews", "language": "en"},
-    {"name": "NPR", "rss": "https://feeds.npr.org/1001/rss.xml", "language": "en"},
-    {"name": "The Guardian", "rss": "https://www.theguardian.com/world/rss", "language": "en"},
-    # Hindi sources
-    {"name": "Jagran", "rss": "https://www.jagran.com/rss/news-national.xml", "language": "hi"},
-    {"name": "Dainik Bhaskar", "rss": "https://www.bhaskar.com/rss-v1--category-1740.xml", "language": "hi"},
-    # Kannada sources
-    {"name": "Vijaya Karnataka", "rss": "https://vijaykarnataka.com/rss", "language": "kn"},
-    {"name": "Prajavani", "rss": "https://www.prajavani.net/feed", "language": "kn"},
-    {"name": "Udayavani", "rss": "https://www.udayavani.com/feed", "language": "kn"},
-]
+    return run_analysis(news_items, on_error=lambda message: st.error(message, icon="🔥"))
 
-def analyze_content_for_abuse(text):
-    """Use Gemini to analyze text for abusive content beyond predefined keywords"""
-    if not gemini_initialized:
-        return False, []
+def generate_pdf(news_items, date_str, language, search_keyword=None, analysis_text=None):
+    """Generate a PDF report of news items with optional AI analysis"""
+    from pdf_report import generate_pdf as build_pdf  # reportlab is only needed for reports
     
-    try:
-        prompt = f"""Analyze the following text for potentially abusive, harmful, or toxic content. 
-        Identify any language that could be considered offensive, threatening, hateful, or inappropriate.
-        
-        Text to analyze: "{text}"
-        
-        Return your response in this format:
-        - Is_Abusive: [Yes/No]
-        - Abusive_Elements: [List specific words, phrases or elements that are problematic]
-        - Severity: [Low/Medium/High]
-        - Explanation: [Brief explanation]
-        """
-        
-        model = GenerativeModel('gemini-1.5-flash-latest')
-        response = model.generate_content(
-            prompt,
-            generation_config=genai.types.GenerationConfig(
-                max_output_tokens=300, temperature=0.2),
-            request_options={'timeout': 30}
-        )
-        
-        analysis_text = "".join(part.text for part in response.candidates[0].content.parts).strip()
-        
-        # Parse the response to extract information
-        is_abusive = "is_abusive: yes" in analysis_text.lower()
-        
-        # Extract abusive elements if any
-        abusive_elements = []
-        for line in analysis_text.split('\n'):
-            if "abusive_elements:" in line.lower():
-                elements_text = line.split(':', 1)[1].strip()
-                # Remove brackets and split by commas
-                elements_text = elements_text.strip('[]')
-                abusive_elements = [e.strip() for e in elements_text.split(',') if e.strip()]
-        
-        return is_abusive, abusive_elements
-        
-    except Exception as e:
-        st.warning(f"Error analyzing content for abuse: {str(e)}")
-        return False, []
-
-def highlight_abusive_words(text, languages=["en"], ai_detected_elements=None):
-    keywords = []
-    for lang in languages:
-        keywords += ABUSIVE_KEYWORDS.get(lang, [])
-    keywords = list(set(filter(None, keywords)))
-
-    for word in keywords:
-        pattern = re.compile(r'\b' + re.escape(word) + r'\b', re.IGNORECASE)
-        text = pattern.sub(lambda m: f'<span style="color:red;font-weight:bold">{m.group()}</span>', text)
-
-    if ai_detected_elements:
-        for element in ai_detected_elements:
-            if element and len(element) > 2:
-                pattern = re.compile(re.escape(element), re.IGNORECASE)
-                text = pattern.sub(lambda m: f'<span style="color:orange;font-weight:bold">{m.group()}</span>', text)
-
-    return text
-
+    return build_pdf(news_items, date_str, language, search_keyword, analysis_text)
 
-def highlight_search_keyword(text, keyword):
-    """Highlight search keyword in the text"""
-    if not keyword:
-        return text
-    pattern = re.compile(r'\b' + re.escape(keyword) + r'\b', re.IGNORECASE)
-    return pattern.sub(f'<span style="color:green;font-weight:bold">{keyword}</span>', text)
+def find_duplicate_news(news_items, threshold=0.8):
+    """Find duplicate news items based on title similarity.
 
-def get_news_hash(title):
-    """Generate a hash for a news title to identify duplicates"""
-    return hashlib.md5(title.lower().encode()).hexdigest()
+    Returns a dict mapping the first index of each cluster of similar titles
+    to the indices of the other items in that cluster.
+    """
+    from news_dedup import find_duplicate_news as find_duplicates  # pulls in numpy/scipy/sklearn, so import on first use
+    
+    return find_duplicates(news_items, threshold)
 
-def fetch_rss_news(language="en", days_back=1, search_keyword=None, use_ai_analysis=False):
-    """Fetch news from RSS feeds based on selected language"""
-    all_news = []
+def recommend_news(news_items, interests, top_k=10):
+    """Rank every fetched item against the selected interests locally and return the best ones."""
+    from news_recommender import rank_by_interests  # pulls in numpy/sklearn, so import on first use
     
-    # Calculate the date threshold for recent news
-    date_threshold = datetime.now() - timedelta(days=days_back)
+    return [news_items[index] for index, _ in rank_by_interests(news_items, interests, top_k)]
+
+def rerank_with_gemini(candidates, interests):
+    """Ask Gemini to reorder locally ranked candidates by relevance to the interests."""
+    news_texts = [f"Title: {item['title']}\nDescription: {item.get('description', '')}" for item in candidates]
     
-    for source in NEWS_SOURCES:
-        if source["language"] == language:
-            try:
-                feed = feedparser.parse(source["rss"])
-                for entry in feed.entries[:20]:  # Increased limit to get more recent news
-                    title = entry.title
-                    link = entry.link
-                    description = entry.description if hasattr(entry, 'description') else ""
-                    
-                    # Parse the published date
-                    pub_date = None
-                    if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                        pub_date = datetime(*entry.published_parsed[:6])
-                    elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                        pub_date = datetime(*entry.updated_parsed[:6])
-                    
-                    # Skip if not recent enough and we have a date
-                    if pub_date and pub_date < date_threshold:
-                        continue
-                    
-                    # Skip if search keyword is provided and not in title or description
-                    if search_keyword and search_keyword.lower() not in title.lower() and search_keyword.lower() not in description.lower():
-                        continue
-                    
-                    # Create a unique hash for this news item
-                    news_hash = get_news_hash(title)
-                    
-                    # Check for abusive content using predefined keywords
-                    has_keyword_abuse = any(re.search(r'\b' + word + r'\b', title + " " + description, re.IGNORECASE) for word in ABUSIVE_KEYWORDS)
-                    
-                    # Check for abusive content using AI (if enabled)
-                    ai_abuse_detected = False
-                    ai_abuse_elements = []
-                    
-                    # Only use AI analysis if enabled and keyword detection didn't find anything
-                    if use_ai_analysis and not has_keyword_abuse and gemini_initialized:
-                        # Combine title and description for analysis
-                        full_text = f"{title}. {description}"
-                        ai_abuse_detected, ai_abuse_elements = analyze_content_for_abuse(full_text)
-                    
-                    all_news.append({
-                        "title": title,
-                        "link": link,
-                        "description": description,
-                        "source": source["name"],
-                        "hash": news_hash,
-                        "has_abusive": has_keyword_abuse or ai_abuse_detected,
-                        "abusive_elements": ai_abuse_elements,
-                        "pub_date": pub_date
-                    })
-            except Exception as e:
-                st.warning(f"Error fetching from {source['name']}: {str(e)}")
+    prompt = f"""Given the following news articles and user interests, identify which articles 
+    would be most relevant to the user's interests. Return the index numbers (starting from 0) 
+    of the most relevant articles, most relevant first.
     
-    # Remove duplicates based on hash
-    unique_news = []
-    seen_hashes = set()
+    User interests: {', '.join(interests)}
     
-    for news in all_news:
-        if news["hash"] not in seen_hashes:
-            seen_hashes.add(news["hash"])
-            unique_news.append(news)
+    News articles:
+    {news_texts}
     
-    # Sort by publication date (newest first)
-    unique_news.sort(key=lambda x: x.get("pub_date") or datetime.min, reverse=True)   
+    Return only the indices of relevant articles as a comma-separated list, like: 0, 3, 5, 7
+    """
     
-    return unique_news
-
-def analyze_with_gemini(news_items):
-    """Analyze news items using Google's Gemini API"""
-    if not gemini_initialized:
-        return "Gemini API is not configured or initialized. Please check your API key."
-
-    try:
-        items_for_analysis = news_items[:15]  # Analyze top 15 items
-        if not items_for_analysis:
-            return "No news items provided for analysis."
-
-        news_summary = "\n\n".join([
-            f"Title: {item['title']}\nSource: {item['source']}\nDescription: {item.get('description', 'No description available')}"
-            for item in items_for_analysis
-        ]).strip()
-        if not news_summary:
-            return "Could not generate summary from provided news items."
-
-        prompt = f"""Please analyze the following news headlines and descriptions. Provide a concise analysis covering these points:
-
-1.  **Main Themes:** What are the 2-3 dominant topics or themes emerging from these news items?
-2.  **Key Trends/Patterns:** Are there any noticeable trends, recurring events, or patterns?
-3.  **Potential Bias/Perspective:** Briefly comment if any significant bias or specific viewpoint is apparent from the headlines provided (acknowledge limitations if based only on headlines).
-4.  **Regional/Global Impact:** Briefly mention any potential wider implications (regional or global) suggested by the news.
-
-Keep the overall analysis brief, insightful, and structured (e.g., use bullet points or numbered lists for clarity).
-
-**News Items for Analysis:**
----
-{news_summary}
----
-**Your Analysis:**
-"""
-        model = GenerativeModel('gemini-1.5-flash-latest')
-        response = model.generate_content(
-            prompt,
-            generation_config=genai.types.GenerationConfig(
-                max_output_tokens=800, temperature=0.6),
-            request_options={'timeout': 120}
-        )
+    indices_text = get_scheduler().generate_text(prompt, max_output_tokens=100, temperature=0.1, timeout=30)
+    indices = [int(idx.strip()) for idx in indices_text.split(',') if idx.strip().isdigit()]
+    reranked = [candidates[idx] for idx in dict.fromkeys(indices) if 0 <= idx < len(candidates)]
+    # Keep the local order for anything Gemini left out
+    return reranked + [item for item in candidates if not any(item is r for r in reranked)]
 
-        analysis_text = ""
-        if response.candidates:
-            try:
-                analysis_text = "".join(part.text for part in response.candidates[0].content.parts).strip()
-            except (AttributeError, IndexError):
-                pass
-        if not analysis_text and hasattr(response, 'text'):
-            analysis_text = response.text.strip()
-        if not analysis_text and response.parts:
-            analysis_text = "".join(part.text for part in response.parts).strip()
+def get_topic_model():
+    """Create an empty local topic model for this session"""
+    from news_topics import TopicModel  # pulls in numpy/scipy/sklearn, so import on first use
+    return TopicModel()
 
-        if not analysis_text and hasattr(response, 'prompt_feedback') and response.prompt_feedback.block_reason:
-            reason = response.prompt_feedback.block_reason
-            st.error(f"Gemini analysis blocked. Reason: {reason}", icon="🚫")
-            return f"Analysis blocked by safety settings or content policy: {reason}"
-        elif not analysis_text:
-            st.warning("Gemini returned an empty response.", icon="🤔")
-            return "Gemini returned an empty response. The prompt might need adjustment or the model could not generate content."
-
-        return analysis_text
-
-    except Exception as e:
-        st.error(f"Error during Gemini API call: {str(e)}", icon="🔥")
-        if "API key not valid" in str(e):
-            return "Invalid Gemini API Key."
-        elif "quota" in str(e).lower():
-            return "Gemini API Quota exceeded."
-        elif "resource has been exhausted" in str(e).lower():
-            return "Gemini API resources exhausted (quota)."
-        elif "model" in str(e).lower() and ("not found" or "does not exist") in str(e).lower():
-            return f"Gemini Model not found or unavailable."
-        elif "DeadlineExceeded" in str(e) or "timed out" in str(e).lower():
-            return "Gemini API call timed out. Try reducing the number of articles analyzed or check network."
-        return f"An unexpected error occurred with Gemini: {str(e)}"
-
-def analyze_news(news_items):
-    """Analyze news using the Gemini AI model"""
-    if not news_items:
-        return "No news items to analyze. Please fetch news first."
-    return analyze_with_gemini(news_items)
-
-def generate_pdf(news_items, date_str, language, search_keyword=None, analysis_text=None):
-    """Generate a PDF report of news items with optional AI analysis"""
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    styles = getSampleStyleSheet()
-    
-    # Create custom styles
-    title_style = ParagraphStyle(
-        'TitleStyle',
-        parent=styles['Heading1'],
-        fontSize=16,
-        spaceAfter=12,
-        alignment=1  # Center alignment
-    )
+def name_topics_with_gemini(topics, news_by_hash):
+    """Ask Gemini for a short name per topic cluster, given its top terms and a few titles."""
+    descriptions = []
+    for i, topic in enumerate(topics, 1):
+        titles = "; ".join(news_by_hash[news_hash]["title"] for news_hash in topic["hashes"][:3])
+        descriptions.append(f"{i}. Terms: {', '.join(topic['terms'])}. Example headlines: {titles}")
     
-    subtitle_style = ParagraphStyle(
-        'SubtitleStyle',
-        parent=styles['Heading2'],
-        fontSize=14,
-        spaceAfter=10,
-        textColor=colors.blue
-    )
+    prompt = f"""Give each of the following news topic clusters a short descriptive name (2-5 words),
+    in the language of its headlines.
     
-    news_style = ParagraphStyle(
-        'NewsStyle',
-        parent=styles['Normal'],
-        fontSize=12,
-        spaceAfter=6
-    )
+    {chr(10).join(descriptions)}
     
-    source_style = ParagraphStyle(
-        'SourceStyle',
-        parent=styles['Italic'],
-        fontSize=10,
-        textColor=colors.gray,
-        spaceAfter=12
-    )
-    
-    link_style = ParagraphStyle(
-        'LinkStyle',
-        parent=styles['Normal'],
-        fontSize=10,
-        textColor=colors.blue,
-        spaceAfter=15
-    )
+    Reply with exactly {len(topics)} lines, one name per line, in the same order, with no numbering.
+    """
     
-    ai_warning_style = ParagraphStyle(
-        'AIWarningStyle',
-        parent=styles['Normal'],
-        fontSize=10,
-        textColor=colors.orange,
-        spaceAfter=8,
-        leftIndent=10,
-        borderWidth=0,
-        borderColor=colors.orange,
-        borderPadding=0,
-        borderRadius=0,
-        borderLeftWidth=2,
-        borderLeftColor=colors.orange,
-        borderLeftPadding=5
-    )
+    names_text = get_scheduler().generate_text(prompt, max_output_tokens=300, temperature=0.2, timeout=30)
+    return [line.strip().lstrip("0123456789.-) ").strip() for line in names_text.splitlines() if line.strip()]
+
+def sentiment_report(news_items):
+    """Score every item's sentiment locally and aggregate it by source and day"""
+    from news_sentiment import sentiment_report as build_report  # pulls in numpy/sklearn, so import on first use
+    return build_report(news_items)
+
+def summarize_sentiment_with_gemini(report, news_items, examples=5):
+    """Ask Gemini for a short narrative of the locally computed sentiment, with the most extreme headlines."""
+    order = report["scores"].argsort()
+    most_negative = [news_items[i]["title"] for i in order[:examples] if report["scores"][i] < 0]
+    most_positive = [news_items[i]["title"] for i in order[::-1][:examples] if report["scores"][i] > 0]
+    by_source = "\n".join(f"- {row['source']}: {row['positive']} positive, {row['neutral']} neutral, "
+                          f"{row['negative']} negative" for row in report["by_source"])
+    overall = report["overall"]
     
-    # Create the content
-    content = []
+    prompt = f"""The sentiment of {overall['items']} news items was scored with a word lexicon:
+    {overall['positive']} positive, {overall['neutral']} neutral and {overall['negative']} negative.
     
-    # Add title
-    lang_name = {"en": "English", "hi": "Hindi", "kn": "Kannada"}
-    content.append(Paragraph(f"News Report - {date_str}", title_style))
-    content.append(Paragraph(f"Language: {lang_name.get(language, 'Unknown')}", subtitle_style))
+    By source:
+    {by_source}
     
-    if search_keyword:
-        content.append(Paragraph(f"Keyword Search: '{search_keyword}'", subtitle_style))
+    Most negative headlines:
+    {chr(10).join(most_negative) or 'none'}
     
-    content.append(Spacer(1, 12))
+    Most positive headlines:
+    {chr(10).join(most_positive) or 'none'}
     
-    # Add abusive content warning if needed
-    has_abusive = any(news["has_abusive"] for news in news_items)
-    if has_abusive:
-        warning_style = ParagraphStyle(
-            'WarningStyle',
-            parent=styles['Normal'],
-            fontSize=12,
-            textColor=colors.red,
-            spaceAfter=12,
-            borderWidth=1,
-            borderColor=colors.red,
-            borderPadding=5,
-            borderRadius=5
-        )
-        content.append(Paragraph("⚠️ WARNING: This report contains potentially sensitive content highlighted in red", warning_style))
-        content.append(Spacer(1, 12))
+    Write a short assessment of whether the coverage is predominantly positive, negative, neutral or mixed,
+    how the sources differ, and which emotional tones (fear, hope, anger, etc.) stand out.
+    """
     
-    # Add news items
+    return get_scheduler().generate_text(prompt, max_output_tokens=500, temperature=0.2, timeout=45)
+
+def render_news_list(news_items, language_code, search_keyword=None):
+    """Render news items as highlighted HTML boxes"""
     for i, news in enumerate(news_items, 1):
-        # Check for abusive words and highlight them
-        title = news["title"]
-        
-        # Highlight predefined abusive keywords
-        for word in ABUSIVE_KEYWORDS:
-            if re.search(r'\b' + word + r'\b', title, re.IGNORECASE):
-                title = re.sub(r'\b' + word + r'\b', f'<font color="red"><b>{word}</b></font>', title, flags=re.IGNORECASE)
-        
-        # Highlight search keyword if provided
-        if search_keyword and search_keyword.lower() in title.lower():
-            title = re.sub(r'\b' + re.escape(search_keyword) + r'\b', f'<font color="green"><b>{search_keyword}</b></font>', title, flags=re.IGNORECASE)
+        #title = highlight_abusive_words(news["title"], news.get("abusive_elements", []))
+        title = highlight_abusive_words(news["title"], language_code, news.get("abusive_elements", []),
+                                        news.get("keyword_spans"), search_keyword)
         
-        # Add the news item
-        content.append(Paragraph(f"{i}. {title}", news_style))
+        date_str = ""
+        if news.get("pub_date"):
+            date_str = f"<div class='news-date'>Published: {news['pub_date'].strftime('%Y-%m-%d %H:%M')}</div>"
         
-        # Add AI-detected abusive elements warning if any
+        # Add an abuse warning if detected by AI
+        abuse_warning = ""
         if news.get("has_abusive") and news.get("abusive_elements"):
-            ai_warning = f"⚠️ AI detected potentially problematic content: {', '.join(news.get('abusive_elements', []))}"
-            content.append(Paragraph(ai_warning, ai_warning_style))
+            abuse_warning = f"""<div class="abuse-warning">
+                ⚠️ AI detected potentially problematic content: {', '.join(news.get('abusive_elements', []))}
+            </div>"""
         
-        # Add publication date if available
-        if news.get("pub_date"):
-            date_str = news["pub_date"].strftime("%Y-%m-%d %H:%M")
-            content.append(Paragraph(f"Published: {date_str}", source_style))
-            
-        content.append(Paragraph(f"Source: {news['source']}", source_style))
-        content.append(Paragraph(f"<a href='{news['link']}'>Read full article</a>", link_style))
-        content.append(Spacer(1, 10))
-    
-    # Add AI Analysis if available
-    if analysis_text:
-        content.append(Spacer(1, 0.3*72))
-        analysis_title_style = ParagraphStyle('AnalysisTitleStyle', parent=styles['h2'], fontSize=14, spaceAfter=10, textColor=colors.darkgreen)
-        analysis_body_style = ParagraphStyle('AnalysisBodyStyle', parent=styles['Normal'], fontSize=10, leading=13, spaceAfter=8, leftIndent=10, rightIndent=10, alignment=4)
-        content.append(Paragraph("Gemini AI Analysis", analysis_title_style))
-        content.append(Spacer(1, 0.1*72))
-        analysis_paragraphs = analysis_text.split('\n')
-        for para in analysis_paragraphs:
-            para_strip = para.strip()
-            if para_strip:
-                safe_para = para_strip.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-                safe_para = re.sub(r'\*\*(.*?)\*\*', r'<b>\1</b>', safe_para)
-                safe_para = re.sub(r'\*(.*?)\*', r'<i>\1</i>', safe_para)
-                safe_para = safe_para.replace('&lt;b&gt;', '<b>').replace('&lt;/b&gt;', '</b>').replace('&lt;i&gt;', '<i>').replace('&lt;/i&gt;', '</i>')
-                content.append(Paragraph(safe_para, analysis_body_style))
-
-    # Build the PDF
-    doc.build(content)
-    buffer.seek(0)
-    return buffer
+        new_badge = "<span class='new-badge'>NEW</span> " if news.get("is_new") else ""
+        
+        st.markdown(
+            f"""<div class="custom-box">
+                {i}- {new_badge}<a href="{news['link']}">{title}</a>
+                {date_str}
+                {abuse_warning}
+                <div class="news-source">Source: {news['source']}</div>
+            </div>""",
+            unsafe_allow_html=True,
+        )
 
-def find_duplicate_news(news_items, threshold=0.8):
-    """Find duplicate news items based on title similarity."""
-    titles = [news['title'] for news in news_items]
-    vectorizer = TfidfVectorizer().fit_transform(titles)
-    vectors = vectorizer.toarray()
-    csim = cosine_similarity(vectors)
-    
-    duplicates = {}
-    for i in range(len(csim)):
-        for j in range(i + 1, len(csim)):
-            if csim[i][j] > threshold:
-                if i not in duplicates:
-                    duplicates[i] = []
-                duplicates[i].append(j)
-    
-    return duplicates
+@st.cache_resource
+def get_news_store():
+    """Open the local news store once per process"""
+    return NewsStore(STORE_PATH)
+
+def news_store_is_fresh(max_age=3600):
+    """Whether news_ingest.py finished a pass within max_age seconds (i.e. ingestion is running)"""
+    if not os.path.exists(STORE_PATH):
+        return False
+    last_ingest = get_news_store().last_ingest_time()
+    return last_ingest is not None and datetime.now().timestamp() - last_ingest <= max_age
+
+def flag_new_news(news_items):
+    """Set news["is_new"] on items no earlier fetch has shown, remember them all as seen and return the new count"""
+    seen_filter = get_seen_filter("app")
+    seen_before = seen_filter.seen_many(news["hash"] for news in news_items)
+    for news in news_items:
+        news["is_new"] = news["hash"] not in seen_before
+    seen_filter.add_many(news["hash"] for news in news_items)
+    return len(news_items) - len(seen_before)
 
 # Main Streamlit app
 st.markdown(
@@ -552,11 +272,28 @@ with col2:
     language_code = {"English": "en", "Hindi": "hi", "Kannada": "kn"}[language_select]
     
     # Keyword search
-    search_keyword = st.text_input("Search for specific keyword in news (optional):")
+    search_keyword = st.text_input("Search for specific keyword in news (optional):",
+                                   help="With locally ingested news this is a full-text search: several words must all match, "
+                                        "\"quoted words\" match as a phrase and word* matches a prefix")
     
     # AI analysis toggle
     use_ai_analysis = st.checkbox("Use AI to detect abusive content", value=False, 
                                  help="Enable AI-based detection of problematic content beyond predefined keywords")
+    
+    # Download the page behind every link, so abuse detection sees the whole article
+    fetch_articles = st.checkbox("Analyze full articles", value=False,
+                                 help="Download each article's full text for keyword and AI abuse detection "
+                                      "(slower; articles are cached on disk)")
+    
+    # Read from the background ingestion store (news_ingest.py) instead of fetching live
+    use_news_store = st.checkbox("Use locally ingested news", value=False, key="use_news_store",
+                                 help="Read news collected by news_ingest.py from the local store instead of fetching every source live")
+    if not use_news_store and news_store_is_fresh():
+        st.caption("news_ingest.py is running; tick the box above to read its store instead of fetching live")
+    
+    # Per-stage timings of the next fetch, shown in an expandable panel
+    record_timings = st.checkbox("Record fetch timings", value=False,
+                                 help="Time each source's download, parsing, keyword detection and AI analysis")
 
 st.write("##")
 
@@ -617,6 +354,14 @@ box_style = """
             font-style: italic;
             font-size: 0.8em;
         }
+        .new-badge {
+            color: black;
+            background-color: #00FF7F;
+            border-radius: 3px;
+            padding: 0 4px;
+            font-size: 0.7em;
+            font-weight: bold;
+        }
         .news-date {
             color: #aaa;
             font-size: 0.8em;
@@ -651,91 +396,134 @@ if 'news_items' not in st.session_state:
     st.session_state.news_items = []
 if 'analysis_text' not in st.session_state:
     st.session_state.analysis_text = None
+if 'analysis_cached_at' not in st.session_state:
+    st.session_state.analysis_cached_at = None
+if 'fetch_timings' not in st.session_state:
+    st.session_state.fetch_timings = None
+
+timings = StageTimings() if scrap_btn and record_timings else NO_TIMINGS
+scrape_started = time.perf_counter()
 
 # Scrape news when button is clicked
-if scrap_btn:
+if scrap_btn and use_news_store:
+    try:
+        if date_option == "Custom Date":
+            since = datetime.strptime(f"{year_select} {month_select} {day_select}", "%Y %B %d")
+            until = since + timedelta(days=1)
+        else:
+            since, until = datetime.now() - timedelta(days=days_back), None
+        with timings.stage("store_query"):
+            unique_news = get_news_store().get_news(language_code, since, until, search_keyword)
+    except Exception as e:
+        st.error(f"Error reading the local news store: {str(e)}")
+        unique_news = []
+    new_count = flag_new_news(unique_news)
+    
+    st.session_state.news_items = unique_news
+    last_ingest = get_news_store().last_ingest_time()
+    if len(unique_news) > 0:
+        last_ingest_text = datetime.fromtimestamp(last_ingest).strftime('%Y-%m-%d %H:%M') if last_ingest else "never"
+        st.success(f"Found {len(unique_news)} unique news items in the local store, "
+                   f"{new_count} new since your last fetch (last ingested {last_ingest_text})")
+    elif search_keyword:
+        st.warning(f"No stored news found matching the keyword '{search_keyword}'")
+    else:
+        st.warning("No stored news found for these criteria. Is news_ingest.py running?")
+
+elif scrap_btn:
+    # Results are rendered as each source finishes; the regular list below takes over once done
+    progress_placeholder = st.empty()
+    results_placeholder = st.empty()
+    unique_news = []
+    seen_hashes = set()
+    new_count = 0
+    
     with st.spinner("Fetching news from multiple sources..."):
-        # Get news from RSS feeds
-        rss_news = fetch_rss_news(language_code, days_back, search_keyword, use_ai_analysis)
-        
-        # Get news from sarkaripariksha if language is English or Hindi and using custom date
-        sarkari_news = []
-        if language_code in ["en", "hi"] and date_option == "Custom Date":
-            text_language = "1" if language_code == "en" else "2"
-            url = (
-                "https://sarkaripariksha.com/gk-and-current-affairs/"
-                + year_select
-                + "/"
-                + month_select
-                + "/"
-                + str(day_select)
-                + "/"
-                + text_language
-                + "/"
-            )
-            try:
-                req = requests.get(url)
-                soup = BeautifulSoup(req.text, "html.parser")
-                news_list = soup.find_all("div", class_="examlist-details-img-box")
+        with ThreadPoolExecutor(max_workers=1) as sarkari_executor:
+            # Get news from sarkaripariksha if language is English or Hindi and using custom date,
+            # in the background while the RSS feeds stream in
+            sarkari_future = None
+            if language_code in ["en", "hi"] and date_option == "Custom Date":
+                def timed_sarkari_scrape():
+                    with timings.stage("scrape", "Sarkari Pariksha"):
+                        return scrape_sarkari_pariksha(language_code, year_select, month_select, day_select,
+                                                       search_keyword)
                 
-                for news_item in news_list:
-                    a_tag = news_item.find("h2").find("a")
-                    news_title = a_tag.get_text(strip=True)
-                    href_link = a_tag["href"]
-                    
-                    # Skip if search keyword is provided and not in title
-                    if search_keyword and search_keyword.lower() not in news_title.lower():
-                        continue
-                    
-                    news_hash = get_news_hash(news_title)
-                    
-                    # Check for abusive content using predefined keywords
-                    has_keyword_abuse = any(re.search(r'\b' + word + r'\b', news_title, re.IGNORECASE) for word in ABUSIVE_KEYWORDS)
-                    
-                    # Check for abusive content using AI (if enabled)
-                    ai_abuse_detected = False
-                    ai_abuse_elements = []
+                sarkari_future = sarkari_executor.submit(timed_sarkari_scrape)
+            
+            for source_name, source_news in iter_rss_news(language_code, days_back, search_keyword,
+                                                          use_ai_analysis and gemini_initialized, seen_hashes,
+                                                          on_error=st.warning, timings=timings,
+                                                          fetch_bodies=fetch_articles):
+                new_count += flag_new_news(source_news)
+                with timings.stage("sort", source_name):
+                    for news in source_news:
+                        bisect.insort(unique_news, news, key=news_sort_key)
+                progress_placeholder.caption(f"{source_name}: {len(source_news)} new items ({len(unique_news)} so far)")
+                with timings.stage("render", source_name):
+                    with results_placeholder.container():
+                        render_news_list(unique_news, language_code, search_keyword)
+            
+            if sarkari_future is not None:
+                try:
+                    sarkari_news = merge_news(unique_news, seen_hashes, sarkari_future.result())
+                    new_count += flag_new_news(sarkari_news)
+                    timings.count("scrape", "kept", len(sarkari_news), "Sarkari Pariksha")
                     
-                    # Only use AI analysis if enabled and keyword detection didn't find anything
-                    if use_ai_analysis and not has_keyword_abuse and gemini_initialized:
-                        ai_abuse_detected, ai_abuse_elements = analyze_content_for_abuse(news_title)
+                    if fetch_articles:
+                        with timings.stage("articles", "Sarkari Pariksha"):
+                            add_article_bodies(sarkari_news, language_code, st.warning,
+                                               timings.for_source("Sarkari Pariksha"))
                     
-                    sarkari_news.append({
-                        "title": news_title,
-                        "link": href_link,
-                        "description": "",
-                        "source": "Sarkari Pariksha",
-                        "hash": news_hash,
-                        "has_abusive": has_keyword_abuse or ai_abuse_detected,
-                        "abusive_elements": ai_abuse_elements,
-                        "pub_date": datetime.now()  # Assume current date as publication date
-                    })
-            except Exception as e:
-                st.error(f"Error fetching from Sarkari Pariksha: {str(e)}")
-        
-        # Combine and deduplicate news
-        all_news = rss_news + sarkari_news
-        unique_news = []
-        seen_hashes = set()
-        
-        for news in all_news:
-            if news["hash"] not in seen_hashes:
-                seen_hashes.add(news["hash"])
-                unique_news.append(news)
-        
-        # Sort by publication date (newest first)
-        unique_news.sort(key=lambda x: x.get("pub_date")or datetime.min, reverse=True)
+                    # Check for abusive content using AI (if enabled) in batched requests
+                    if use_ai_analysis and gemini_initialized:
+                        with timings.stage("ai_analysis", "Sarkari Pariksha"):
+                            apply_ai_abuse_analysis(sarkari_news, on_error=st.warning)
+                except Exception as e:
+                    st.error(f"Error fetching from Sarkari Pariksha: {str(e)}")
         
+        progress_placeholder.empty()
+        results_placeholder.empty()
         st.session_state.news_items = unique_news
         
+        # Index what we fetched so later keyword searches are local full-text queries
+        try:
+            with timings.stage("store_write"):
+                get_news_store().add_news(unique_news, language_code)
+        except Exception as e:
+            st.warning(f"Could not save news to the local store: {str(e)}")
+        
         if len(unique_news) > 0:
-            st.success(f"Found {len(unique_news)} unique news items")
+            st.success(f"Found {len(unique_news)} unique news items, {new_count} new since your last fetch")
         else:
             if search_keyword:
                 st.warning(f"No news found matching the keyword '{search_keyword}'")
             else:
                 st.warning("No recent news found. Try adjusting your search criteria.")
 
+if timings.enabled:
+    timings.add("total", time.perf_counter() - scrape_started)
+    st.session_state.fetch_timings = timings
+elif scrap_btn:
+    st.session_state.fetch_timings = None
+
+# Show where the last fetch spent its time
+if st.session_state.fetch_timings is not None:
+    with st.expander("⏱️ Fetch timings"):
+        fetch_timings = st.session_state.fetch_timings
+        st.caption("Seconds per stage, summed over sources (downloads run in parallel, so they can exceed the total)")
+        st.write({stage: round(seconds, 3) for stage, seconds in fetch_timings.totals().items()})
+        st.dataframe(
+            [{"stage": record["stage"], "source": record["source"] or "", "seconds": round(record["seconds"], 4),
+              "calls": record["calls"], **record["counters"]} for record in fetch_timings.records()]
+        )
+        st.download_button(
+            "Download timings (JSON)",
+            fetch_timings.to_json(language=language_code, date_option=date_option, search_keyword=search_keyword),
+            file_name="fetch_timings.json",
+            mime="application/json",
+        )
+
 # Analyze news when button is clicked
 if analyze_btn:
     if not st.session_state.news_items:
@@ -744,42 +532,20 @@ if analyze_btn:
         st.error("Gemini API key missing/invalid.", icon="🔥")
     else:
         with st.spinner("Analyzing news with Google Gemini..."):
-            st.session_state.analysis_text = analyze_news(st.session_state.news_items)
+            st.session_state.analysis_text, st.session_state.analysis_cached_at = analyze_news(st.session_state.news_items)
 
 # Display news items
 if st.session_state.news_items:
-    for i, news in enumerate(st.session_state.news_items, 1):
-        #title = highlight_abusive_words(news["title"], news.get("abusive_elements", []))
-        title = highlight_abusive_words(news["title"], language_code, news.get("abusive_elements", []))
-        if search_keyword:
-            title = highlight_search_keyword(title, search_keyword)
-        
-        date_str = ""
-        if news.get("pub_date"):
-            date_str = f"<div class='news-date'>Published: {news['pub_date'].strftime('%Y-%m-%d %H:%M')}</div>"
-        
-        # Add an abuse warning if detected by AI
-        abuse_warning = ""
-        if news.get("has_abusive") and news.get("abusive_elements"):
-            abuse_warning = f"""<div class="abuse-warning">
-                ⚠️ AI detected potentially problematic content: {', '.join(news.get('abusive_elements', []))}
-            </div>"""
-        
-        st.markdown(
-            f"""<div class="custom-box">
-                {i}- <a href="{news['link']}">{title}</a>
-                {date_str}
-                {abuse_warning}
-                <div class="news-source">Source: {news['source']}</div>
-            </div>""",
-            unsafe_allow_html=True,
-        )
+    render_news_list(st.session_state.news_items, language_code, search_keyword)
 
 # Display AI Analysis
 if st.session_state.analysis_text:
     st.markdown("---")
     analysis_html = st.session_state.analysis_text.replace('```', '').replace('\n', '<br>')
     st.markdown(f"""<div class="analysis-box"><div class="analysis-title">✨ Gemini AI Analysis</div>{analysis_html}</div>""", unsafe_allow_html=True)
+    if st.session_state.analysis_cached_at:
+        cached_at = datetime.fromtimestamp(st.session_state.analysis_cached_at).strftime('%Y-%m-%d %H:%M')
+        st.caption(f"♻️ Cached analysis of these same articles from {cached_at}; no new Gemini request was made.")
     st.markdown("---")
 
 # Generate PDF report
@@ -854,161 +620,107 @@ if show_stats_btn:
             else:
                 st.write("No duplicate news items found across sources.")
 
-# Add a section for topic modeling if there are enough news items
-if len(st.session_state.news_items) >= 5 and gemini_initialized:
+# Topic clusters of every fetched item, computed locally and updated as new items arrive
+if len(st.session_state.news_items) >= 5:
     st.write("### Want to see topic clusters?")
-    if st.button("Generate Topic Clusters"):
-        with st.spinner("Analyzing topics in news articles..."):
-            # Prepare text for topic modeling
-            all_text = [f"{item['title']} {item.get('description', '')}" for item in st.session_state.news_items]
-            
-            # Use Gemini to identify topics
-            try:
-                prompt = f"""Analyze the following news articles and identify 3-5 main topic clusters. 
-                For each cluster, provide:
-                1. A short descriptive name for the topic
-                2. The key themes or focus of this topic cluster
-                
-                News articles to analyze:
-                {all_text[:20]}  # Limit to 20 articles to avoid token limits
-                
-                Format your response as:
-                Topic 1: [Name]
-                - Key themes: [themes]
-                - Related keywords: [keywords]
-                
-                Topic 2: [Name]
-                ...and so on.
-                """
-                
-                model = GenerativeModel('gemini-1.5-flash-latest')
-                response = model.generate_content(
-                    prompt,
-                    generation_config=genai.types.GenerationConfig(
-                        max_output_tokens=800, temperature=0.4),
-                    request_options={'timeout': 60}
-                )
-                
-                topic_analysis = "".join(part.text for part in response.candidates[0].content.parts).strip()
-                
-                # Display the topics
-                st.markdown("#### Topic Clusters in Current News")
-                st.markdown(topic_analysis)
-                
-            except Exception as e:
-                st.error(f"Error generating topic clusters: {str(e)}")
-
-# Add a section for sentiment analysis
-if st.session_state.news_items and gemini_initialized:
+    if st.checkbox("Show topic clusters", value=False):
+        if 'topic_model' not in st.session_state:
+            st.session_state.topic_model = get_topic_model()
+        topic_model = st.session_state.topic_model
+        topic_model.add(st.session_state.news_items)
+        news_by_hash = {news["hash"]: news for news in st.session_state.news_items}
+        topics = topic_model.topics(news_by_hash)
+        
+        # Gemini is only asked for readable names; the clusters themselves are local
+        topic_key = tuple(tuple(topic["terms"]) for topic in topics)
+        if st.button("Name the clusters with Gemini", disabled=not gemini_initialized):
+            with st.spinner("Naming topic clusters..."):
+                try:
+                    st.session_state.topic_names = (topic_key, name_topics_with_gemini(topics, news_by_hash))
+                except Exception as e:
+                    st.error(f"Error naming topic clusters: {str(e)}")
+        topic_names = []
+        if st.session_state.get('topic_names') and st.session_state.topic_names[0] == topic_key:
+            topic_names = st.session_state.topic_names[1]
+        
+        st.markdown("#### Topic Clusters in Current News")
+        for i, topic in enumerate(topics):
+            name = topic_names[i] if i < len(topic_names) and topic_names[i] else f"Topic {i + 1}"
+            st.markdown(f"**{name}** ({len(topic['hashes'])} articles) — {', '.join(topic['terms'])}")
+            for news_hash in topic["hashes"][:5]:
+                st.markdown(f"- {news_by_hash[news_hash]['title']} *({news_by_hash[news_hash]['source']})*")
+
+# Sentiment of every fetched item, scored locally; Gemini only adds an optional narrative
+if st.session_state.news_items:
     st.write("### Analyze Sentiment of News Coverage")
-    if st.button("Analyze Sentiment"):
-        with st.spinner("Analyzing sentiment in news articles..."):
-            # Prepare text for sentiment analysis
-            titles = [item['title'] for item in st.session_state.news_items[:15]]  # Limit to 15 articles
-            
-            # Use Gemini for sentiment analysis
-            try:
-                prompt = f"""Analyze the sentiment of the following news headlines. 
-                Provide an overall assessment of whether the news coverage is predominantly:
-                - Positive
-                - Negative
-                - Neutral
-                - Mixed
-                
-                Also identify any emotional tones present (fear, hope, anger, etc.) and explain your reasoning.
-                
-                News headlines:
-                {titles}
-                """
-                
-                model = GenerativeModel('gemini-1.5-flash-latest')
-                response = model.generate_content(
-                    prompt,
-                    generation_config=genai.types.GenerationConfig(
-                        max_output_tokens=500, temperature=0.2),
-                    request_options={'timeout': 45}
-                )
-                
-                sentiment_analysis = "".join(part.text for part in response.candidates[0].content.parts).strip()
-                
-                # Display the sentiment analysis
-                st.markdown("#### Sentiment Analysis of News Coverage")
-                st.markdown(sentiment_analysis)
-                
-            except Exception as e:
-                st.error(f"Error analyzing sentiment: {str(e)}")
+    if st.checkbox("Show sentiment analysis", value=False):
+        report = sentiment_report(st.session_state.news_items)
+        overall = report["overall"]
+        st.markdown("#### Sentiment Analysis of News Coverage")
+        columns = st.columns(3)
+        for column, label in zip(columns, ("positive", "neutral", "negative")):
+            column.metric(label.capitalize(), overall[label], f"{overall[label] / overall['items'] * 100:.0f}%",
+                          delta_color="off")
+        
+        st.write("#### Sentiment by Source")
+        st.bar_chart(report["by_source"], x="source", y=["positive", "neutral", "negative"])
+        st.dataframe(report["by_source"], hide_index=True)
+        if len(report["by_day"]) > 1:
+            st.write("#### Sentiment by Day")
+            st.bar_chart(report["by_day"], x="day", y=["positive", "neutral", "negative"])
+        
+        sentiment_key = tuple(news["hash"] for news in st.session_state.news_items)
+        if st.button("Summarize the sentiment with Gemini", disabled=not gemini_initialized):
+            with st.spinner("Summarizing sentiment of news coverage..."):
+                try:
+                    st.session_state.sentiment_summary = (
+                        sentiment_key, summarize_sentiment_with_gemini(report, st.session_state.news_items))
+                except Exception as e:
+                    st.error(f"Error analyzing sentiment: {str(e)}")
+        if st.session_state.get('sentiment_summary') and st.session_state.sentiment_summary[0] == sentiment_key:
+            st.markdown(st.session_state.sentiment_summary[1])
 
 # Add a section for content recommendations
 if st.session_state.news_items:
     st.write("### News Recommendations")
+    # Let user select interests
+    interests = st.multiselect(
+        "Select your interests:",
+        ["Politics", "Technology", "Business", "Health", "Sports", "Entertainment", "Science", "Environment"]
+    )
+    use_gemini_rerank = st.checkbox("Refine the ranking with Gemini", value=False, disabled=not gemini_initialized,
+                                    help="Recommendations are ranked locally over every fetched item; "
+                                         "this additionally asks Gemini to reorder the best matches")
+    
     if st.button("Get Personalized Recommendations"):
-        # Let user select interests
-        interests = st.multiselect(
-            "Select your interests:",
-            ["Politics", "Technology", "Business", "Health", "Sports", "Entertainment", "Science", "Environment"]
-        )
-        
-        if interests:
+        if not interests:
+            st.warning("Select at least one interest first.")
+        else:
             with st.spinner("Generating personalized recommendations..."):
-                # Filter news based on interests
-                recommended_news = []
+                # Rank every fetched item by similarity to the interests
+                recommended_news = recommend_news(st.session_state.news_items, interests,
+                                                  top_k=20 if use_gemini_rerank else 10)
                 
-                if gemini_initialized:
-                    # Use Gemini to match news to interests
+                if use_gemini_rerank and gemini_initialized and recommended_news:
                     try:
-                        news_texts = [f"Title: {item['title']}\nDescription: {item.get('description', '')}" 
-                                     for item in st.session_state.news_items[:20]]
-                        
-                        prompt = f"""Given the following news articles and user interests, identify which articles 
-                        would be most relevant to the user's interests. Return the index numbers (starting from 0) 
-                        of the most relevant articles.
-                        
-                        User interests: {', '.join(interests)}
-                        
-                        News articles:
-                        {news_texts}
-                        
-                        Return only the indices of relevant articles as a comma-separated list, like: 0, 3, 5, 7
-                        """
-                        
-                        model = GenerativeModel('gemini-1.5-flash-latest')
-                        response = model.generate_content(
-                            prompt,
-                            generation_config=genai.types.GenerationConfig(
-                                max_output_tokens=100, temperature=0.1),
-                            request_options={'timeout': 30}
-                        )
-                        
-                        indices_text = "".join(part.text for part in response.candidates[0].content.parts).strip()
-                        
-                        # Parse indices
-                        try:
-                            indices = [int(idx.strip()) for idx in indices_text.split(',') if idx.strip().isdigit()]
-                            for idx in indices:
-                                if 0 <= idx < len(st.session_state.news_items):
-                                    recommended_news.append(st.session_state.news_items[idx])
-                        except:
-                            # Fallback if parsing fails
-                            recommended_news = st.session_state.news_items[:5]
-                            
+                        recommended_news = rerank_with_gemini(recommended_news, interests)
                     except Exception as e:
-                        st.error(f"Error generating recommendations: {str(e)}")
-                        recommended_news = st.session_state.news_items[:5]
-                else:
-                    # Simple fallback if Gemini is not available
-                    recommended_news = st.session_state.news_items[:5]
-                
-                # Display recommendations
-                st.markdown("#### Recommended Articles Based on Your Interests")
-                for i, news in enumerate(recommended_news, 1):
-                    title = highlight_abusive_words(news["title"], news.get("abusive_elements", []))
-                    st.markdown(
-                        f"""<div class="custom-box recommendation">
-                            {i}- <a href="{news['link']}">{title}</a>
-                            <div class="news-source">Source: {news['source']}</div>
-                        </div>""",
-                        unsafe_allow_html=True,
-                    )
+                        st.warning(f"Gemini re-ranking failed, showing the local ranking: {str(e)}")
+                recommended_news = recommended_news[:10]
+            
+            # Display recommendations
+            st.markdown("#### Recommended Articles Based on Your Interests")
+            if not recommended_news:
+                st.info("None of the fetched articles match these interests.")
+            for i, news in enumerate(recommended_news, 1):
+                title = highlight_abusive_words(news["title"], language_code, news.get("abusive_elements", []))
+                st.markdown(
+                    f"""<div class="custom-box recommendation">
+                        {i}- <a href="{news['link']}">{title}</a>
+                        <div class="news-source">Source: {news['source']}</div>
+                    </div>""",
+                    unsafe_allow_html=True,
+                )
 
 # Add a footer with information about the app
 st.markdown("---")
@@ -1043,7 +755,11 @@ with st.expander("Help & Information"):
     
     ### Privacy & Data Usage
     
-    - This app does not store any user data
-    - News content is processed in memory and not saved
+    - No personal data is collected; your interests and searches are only kept for the current session
+    - Fetched news items and their abuse verdicts are saved in a local SQLite news store
+      (`news_store.sqlite`, or the path in `NEWS_STORE_PATH`), shared with `news_ingest.py`
+    - Downloaded feeds, article texts, AI abuse verdicts and analyses, and the hashes of items already
+      shown are cached on disk in `.news_cache` (or the directory in `NEWS_CACHE_DIR`); cached entries expire
+      after a few days to two weeks. Delete these files to clear everything
     - API calls to Gemini are subject to Google's privacy policy
     """)
\ No newline at end of file
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Deterministic synthetic news corpora for the benchmarks.
+
+Titles mix common words from a small per-language vocabulary with generated
+names (people, places, organisations) drawn from a long-tailed distribution,
+like real headlines. A share of them contain abusive keywords or are
+near-duplicates of an earlier title (the same story reworded by another
+source), so the keyword, dedup and report stages do realistic work.
+
+Synthetic Hindi and Kannada titles only ever hold the dictionary forms of
+VOCABULARY and ABUSIVE_KEYWORDS, separated by spaces and composed as typed in
+the source: they never contain an inflected form (हत्याओं for हत्या), a
+nukta written two ways (क़ as U+0958 or as क plus U+093C) or a word ending
+in a zero-width non-joiner (ಬಾಂಬ್‌). Those cases are covered by the
+headlines in fixtures/headlines.tsv, which the match stages add to the feed
+text and check against their expected keywords.
+"""
+import hashlib
+import itertools
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from news_pipeline import ABUSIVE_KEYWORDS, NEWS_SOURCES  # noqa: E402
+
+VOCABULARY = {
+    "en": ("government minister election parliament court police city state rain flood heatwave cricket match "
+           "team market stock shares bank inflation budget company startup technology phone launch space mission "
+           "hospital vaccine doctors students exam results university farmers crop water power railway airport "
+           "road bridge project protest talks summit border trade deal record season film award").split(),
+    "hi": ("सरकार मंत्री चुनाव संसद अदालत पुलिस शहर राज्य बारिश बाढ़ गर्मी क्रिकेट मैच टीम बाजार शेयर बैंक "
+           "महंगाई बजट कंपनी तकनीक फोन अंतरिक्ष मिशन अस्पताल टीका डॉक्टर छात्र परीक्षा परिणाम विश्वविद्यालय "
+           "किसान फसल पानी बिजली रेलवे हवाई सड़क पुल परियोजना प्रदर्शन वार्ता सीमा व्यापार समझौता फिल्म").split(),
+    "kn": ("ಸರ್ಕಾರ ಸಚಿವ ಚುನಾವಣೆ ಸಂಸತ್ತು ನ್ಯಾಯಾಲಯ ಪೊಲೀಸ್ ನಗರ ರಾಜ್ಯ ಮಳೆ ಪ್ರವಾಹ ಬಿಸಿಲು ಕ್ರಿಕೆಟ್ ಪಂದ್ಯ ತಂಡ "
+           "ಮಾರುಕಟ್ಟೆ ಷೇರು ಬ್ಯಾಂಕ್ ಬೆಲೆ ಬಜೆಟ್ ಕಂಪನಿ ತಂತ್ರಜ್ಞಾನ ಫೋನ್ ಬಾಹ್ಯಾಕಾಶ ಆಸ್ಪತ್ರೆ ಲಸಿಕೆ ವೈದ್ಯರು ವಿದ್ಯಾರ್ಥಿಗಳು "
+           "ಪರೀಕ್ಷೆ ಫಲಿತಾಂಶ ವಿಶ್ವವಿದ್ಯಾಲಯ ರೈತರು ಬೆಳೆ ನೀರು ವಿದ್ಯುತ್ ರೈಲು ವಿಮಾನ ರಸ್ತೆ ಸೇತುವೆ ಯೋಜನೆ ಪ್ರತಿಭಟನೆ ಸಿನಿಮಾ").split(),
+}
+
+# Syllables that generated names are built from
+SYLLABLES = {
+    "en": "ka ri to mo la ne sa vi ra da pu ni ge lo ta shi ber man son ton ford ville".split(),
+    "hi": "क र त म ल न स व द प ग ह श ना री ला मा पु वि सिं गढ़ पुर".split(),
+    "kn": "ಕ ರ ತ ಮ ಲ ನ ಸ ವ ದ ಪ ಗ ಹ ಶ ನಾ ರಿ ಲಾ ಮಾ ಪು ವಿ ಹಳ್ಳಿ ಪುರ ಗಿರಿ".split(),
+}
+NAME_COUNT = 5000
+COMMON_WORDS = (4, 8)
+NAME_WORDS = (1, 4)
+
+ABUSIVE_SHARE = 0.05
+DUPLICATE_SHARE = 0.1
+DESCRIPTION_WORDS = (15, 30)
+
+
+def make_names(rng, language):
+    """NAME_COUNT distinct made-up names and their Zipf-like cumulative weights."""
+    names = set()
+    while len(names) < NAME_COUNT:
+        names.add("".join(rng.choices(SYLLABLES[language], k=rng.randint(2, 4))).capitalize())
+    names = sorted(names)
+    rng.shuffle(names)
+    return names, list(itertools.accumulate(1 / rank for rank in range(1, len(names) + 1)))
+
+
+def make_title(rng, language, names, cum_weights):
+    """One synthetic headline, sometimes containing an abusive keyword."""
+    words = rng.choices(VOCABULARY[language], k=rng.randint(*COMMON_WORDS))
+    words += rng.choices(names, cum_weights=cum_weights, k=rng.randint(*NAME_WORDS))
+    rng.shuffle(words)
+    if rng.random() < ABUSIVE_SHARE:
+        words.insert(rng.randrange(len(words) + 1), rng.choice(ABUSIVE_KEYWORDS[language]))
+    return " ".join(words)
+
+
+def make_corpus(size, language="en", seed=0):
+    """
+    Build ``size`` news items in the app's schema.
+
+    About DUPLICATE_SHARE of the items repeat an earlier title with one word
+    changed, under a different source.
+    """
+    rng = random.Random(f"{seed}:{language}:{size}")
+    sources = [source["name"] for source in NEWS_SOURCES if source["language"] == language]
+    vocabulary = VOCABULARY[language]
+    names, cum_weights = make_names(rng, language)
+    now = datetime(2025, 1, 1)
+    items = []
+    for index in range(size):
+        if items and rng.random() < DUPLICATE_SHARE:
+            words = rng.choice(items)["title"].split()
+            words[rng.randrange(len(words))] = rng.choice(vocabulary)
+            title = " ".join(words)
+        else:
+            title = make_title(rng, language, names, cum_weights)
+        has_abusive = any(keyword in title.split() for keyword in ABUSIVE_KEYWORDS[language])
+        items.append({
+            "title": title,
+            "link": f"https://example.com/{language}/{index}",
+            "description": " ".join(rng.choices(vocabulary, k=rng.randint(*DESCRIPTION_WORDS))),
+            "source": rng.choice(sources),
+            "hash": hashlib.md5(f"{title}:{index}".encode()).hexdigest(),
+            "has_abusive": has_abusive,
+            "abusive_elements": [rng.choice(vocabulary)] if has_abusive and rng.random() < 0.5 else [],
+            "pub_date": now - timedelta(minutes=index),
+        })
+    return items
@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+"""
+Offline throughput and peak-memory benchmarks for the news pipeline's hot paths.
+
+Stages:
+    fetch       fetch_rss_news for every language plus the Sarkari Pariksha pages,
+                served from recorded fixtures by a local HTTP server (cold feed cache)
+    fetch-warm  the same with a warm feed cache (conditional GETs answered with 304)
+    parse       parsing of recorded RSS documents on the download threads
+    parse-pool  the same with every document sent to the feed parsing process pool
+    match       abusive keyword matching (token table) over the Hindi and Kannada feed titles and descriptions,
+                plus the headlines of fixtures/headlines.tsv, whose expected matches are checked first
+    match-automaton  the same with the Aho-Corasick automaton, for comparison
+    highlight   abusive keyword, AI element and search keyword highlighting of titles
+    dedup       near-duplicate clustering of titles
+    topics      local topic clustering of titles and descriptions, and its cluster labels
+    sentiment   lexicon sentiment scoring of titles and descriptions, aggregated by source and day
+    pdf         PDF report generation
+
+The corpus stages run on synthetic corpora (see corpus.py) of each requested
+size, with the items spread over English, Hindi and Kannada; the parse and
+match stages cycle through the items of the RSS fixtures (the live feeds'
+text after --record) until they reach that many. Every stage and
+size runs in a fresh process: once for timing, then once more under
+tracemalloc for the peak of Python and numpy allocations.
+
+Usage:
+    python benchmarks/pipeline.py                         # every stage, 1k/10k/100k items
+    python benchmarks/pipeline.py --stages dedup --sizes 1000 100000 --json results.json
+    python benchmarks/pipeline.py --record                # refresh the RSS fixtures from the live feeds
+"""
+import argparse
+import functools
+import http.server
+import importlib
+import json
+import multiprocessing
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+FIXTURE_DIR = os.path.join(BENCH_DIR, "fixtures")
+
+STAGES = ("fetch", "fetch-warm", "parse", "parse-pool", "match", "match-automaton", "highlight", "dedup", "topics",
+          "sentiment", "pdf")
+CORPUS_STAGES = ("parse", "parse-pool", "match", "match-automaton", "highlight", "dedup", "topics", "sentiment", "pdf")
+DEFAULT_SIZES = (1000, 10000, 100000)
+LANGUAGES = ("en", "hi", "kn")
+# Laying out a 100k-item report takes minutes, so larger sizes are skipped unless asked for
+PDF_MAX_SIZE = 10000
+# Fixture items carry fixed dates; look back far enough that none are filtered out
+FIXTURE_DAYS_BACK = 36500
+SEARCH_KEYWORD = {"en": "market", "hi": "बाजार", "kn": "ಮಾರುಕಟ್ಟೆ"}
+
+
+def fixture_name(source):
+    """File name of a source's recorded RSS document."""
+    return re.sub(r"\W+", "_", source["name"].lower()).strip("_") + ".xml"
+
+
+class FixtureServer:
+    """Serve the fixture directory on a random local port from a background thread."""
+
+    def __init__(self):
+        handler = functools.partial(QuietHandler, directory=FIXTURE_DIR)
+        self.httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def mixed_corpus(size):
+    """Synthetic items spread evenly over the languages, each tagged with its language."""
+    from corpus import make_corpus
+
+    items = []
+    for index, language in enumerate(LANGUAGES):
+        count = size // len(LANGUAGES) + (1 if index < size % len(LANGUAGES) else 0)
+        for news in make_corpus(count, language):
+            news["language"] = language
+            items.append(news)
+    return items
+
+
+def setup_fetch(size, warm=False):
+    import news_pipeline
+    import sarkari_crawler
+    from news_fetch import get_feed_cache
+
+    server = FixtureServer()
+    news_pipeline.NEWS_SOURCES = [dict(source, rss=f"{server.url}/rss/{fixture_name(source)}")
+                                  for source in news_pipeline.NEWS_SOURCES]
+    sarkari_crawler.SARKARI_URL = server.url + "/sarkari/{language}.html?date={year}-{month}-{day}"
+    sarkari_crawler.SARKARI_LANGUAGES = {"en": "en", "hi": "hi"}
+    get_feed_cache().clear()
+    if warm:
+        run_fetch(None)
+    return server
+
+
+def run_fetch(state):
+    from news_pipeline import fetch_rss_news, scrape_sarkari_pariksha
+
+    count = 0
+    for language in LANGUAGES:
+        count += len(fetch_rss_news(language, FIXTURE_DAYS_BACK))
+    for language in ("en", "hi"):
+        count += len(scrape_sarkari_pariksha(language, "2025", "january", 1))
+    return count
+
+
+def setup_parse(size, in_processes=False):
+    import news_fetch
+
+    documents = []
+    for name in sorted(os.listdir(os.path.join(FIXTURE_DIR, "rss"))):
+        with open(os.path.join(FIXTURE_DIR, "rss", name), "rb") as f:
+            documents.append(f.read())
+    items_per_document = len(news_fetch.parse_feed(documents[0]))
+    documents = [documents[i % len(documents)] for i in range(-(-size // items_per_document))]
+    if in_processes:
+        news_fetch.PARSE_IN_PROCESS_BYTES = 0
+        # Start the workers before the clock does
+        pool = news_fetch.get_parse_pool()
+        list(pool.map(abs, range(news_fetch.MAX_PARSE_WORKERS)))
+    return documents, in_processes
+
+
+def run_parse(state):
+    from concurrent.futures import ThreadPoolExecutor
+    from news_fetch import MAX_FEED_WORKERS, parse_document
+
+    documents, in_processes = state
+    with ThreadPoolExecutor(max_workers=MAX_FEED_WORKERS) as executor:
+        return sum(len(entries) for entries in executor.map(
+            lambda content: parse_document(content, in_processes), documents))
+
+
+def load_headlines():
+    """Return ``(language, expected keywords, headline)`` rows of fixtures/headlines.tsv."""
+    rows = []
+    with open(os.path.join(FIXTURE_DIR, "headlines.tsv"), encoding="utf-8") as f:
+        for line in f:
+            if line.strip() and not line.startswith("#"):
+                language, expected, headline = line.rstrip("\n").split("\t")
+                rows.append((language, [] if expected == "-" else expected.split(","), headline))
+    return rows
+
+
+def setup_match(size, matcher="token"):
+    from keyword_matcher import KeywordMatcher, TokenMatcher
+    from news_fetch import parse_feed
+    from news_pipeline import ABUSIVE_KEYWORDS, NEWS_SOURCES
+
+    texts = []
+    for source in NEWS_SOURCES:
+        if source["language"] in ("hi", "kn"):
+            with open(os.path.join(FIXTURE_DIR, "rss", fixture_name(source)), "rb") as f:
+                for entry in parse_feed(f.read()):
+                    texts.append((source["language"], entry["title"]))
+                    texts.append((source["language"], entry["description"]))
+    headlines = load_headlines()
+    token_matchers = {language: TokenMatcher(ABUSIVE_KEYWORDS[language]) for language in ("hi", "kn")}
+    for language, expected, headline in headlines:
+        found = [keyword for _, _, keyword in token_matchers[language].find_spans(headline)]
+        if found != expected:
+            raise AssertionError(f"{headline!r}: expected {expected}, matched {found}")
+        texts.append((language, headline))
+    matcher_class = TokenMatcher if matcher == "token" else KeywordMatcher
+    matchers = {language: matcher_class(ABUSIVE_KEYWORDS[language]) for language in ("hi", "kn")}
+    # Build the token pattern before the clock starts
+    matchers["hi"].find_spans(texts[0][1])
+    return [texts[i % len(texts)] for i in range(size)], matchers
+
+
+def run_match(state):
+    texts, matchers = state
+    for language, text in texts:
+        matchers[language].find_spans(text)
+    return len(texts)
+
+
+def run_highlight(news_items):
+    from news_highlight import highlight_abusive_words
+
+    for news in news_items:
+        highlight_abusive_words(news["title"], news["language"], news["abusive_elements"],
+                                search_keyword=SEARCH_KEYWORD[news["language"]])
+    return len(news_items)
+
+
+def run_dedup(news_items):
+    from news_dedup import duplicate_clusters
+
+    duplicate_clusters([news["title"] for news in news_items])
+    return len(news_items)
+
+
+def run_topics(news_items):
+    from news_topics import TopicModel
+
+    model = TopicModel()
+    model.add(news_items)
+    model.topics()
+    return len(news_items)
+
+
+def run_sentiment(news_items):
+    from news_sentiment import sentiment_report
+
+    sentiment_report(news_items)
+    return len(news_items)
+
+
+def run_pdf(news_items):
+    from pdf_report import generate_pdf
+
+    with tempfile.TemporaryFile() as output:
+        generate_pdf(news_items, "1st January, 2025", "en", "market", "**Main Themes:** benchmark", output)
+    return len(news_items)
+
+
+# Imported before the clock starts, so one-off import time is not counted as stage time
+STAGE_MODULES = {
+    "fetch": ["news_pipeline"],
+    "fetch-warm": ["news_pipeline"],
+    "parse": ["news_fetch"],
+    "parse-pool": ["news_fetch"],
+    "match": ["news_pipeline"],
+    "match-automaton": ["news_pipeline"],
+    "highlight": ["news_highlight"],
+    "dedup": ["news_dedup"],
+    "topics": ["news_topics"],
+    "sentiment": ["news_sentiment"],
+    "pdf": ["pdf_report"],
+}
+
+STAGE_FUNCTIONS = {
+    "fetch": (setup_fetch, run_fetch),
+    "fetch-warm": (functools.partial(setup_fetch, warm=True), run_fetch),
+    "parse": (setup_parse, run_parse),
+    "parse-pool": (functools.partial(setup_parse, in_processes=True), run_parse),
+    "match": (setup_match, run_match),
+    "match-automaton": (functools.partial(setup_match, matcher="automaton"), run_match),
+    "highlight": (mixed_corpus, run_highlight),
+    "dedup": (mixed_corpus, run_dedup),
+    "topics": (mixed_corpus, run_topics),
+    "sentiment": (mixed_corpus, run_sentiment),
+    "pdf": (mixed_corpus, run_pdf),
+}
+
+
+def measure(stage, size, trace):
+    """Run one stage in this process and return (items processed, seconds, peak bytes or None)."""
+    os.environ["NEWS_CACHE_DIR"] = tempfile.mkdtemp(prefix="news-bench-")
+    sys.path[:0] = [ROOT, BENCH_DIR]
+    for module in STAGE_MODULES[stage]:
+        importlib.import_module(module)
+    setup, run = STAGE_FUNCTIONS[stage]
+    state = setup(size)
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    count = run(state)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] if trace else None
+    # Worker processes only exit once their own children have, so stop the feed parsing pool here
+    from news_fetch import shutdown_parse_pool
+    shutdown_parse_pool()
+    return count, elapsed, peak
+
+
+def run_isolated(stage, size, trace):
+    # A fresh interpreter per run keeps imports, caches and the allocator state from leaking between stages
+    # (a ProcessPoolExecutor worker, unlike a multiprocessing.Pool one, may start the feed parsing pool)
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(measure, stage, size, trace).result()
+
+
+def record_fixtures():
+    """Download every source's live feed over the fixtures, so the benchmark uses real documents."""
+    sys.path.insert(0, ROOT)
+    from news_fetch import FEED_TIMEOUT, get_session
+    from news_pipeline import NEWS_SOURCES
+
+    for source in NEWS_SOURCES:
+        path = os.path.join(FIXTURE_DIR, "rss", fixture_name(source))
+        try:
+            response = get_session().get(source["rss"], timeout=FEED_TIMEOUT)
+            response.raise_for_status()
+        except Exception as e:
+            print(f"{source['name']}: kept the existing fixture ({e})")
+            continue
+        with open(path, "wb") as f:
+            f.write(response.content)
+        print(f"{source['name']}: recorded {len(response.content)} bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the news pipeline offline")
+    parser.add_argument("--stages", nargs="+", default=list(STAGES), choices=STAGES)
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES),
+                        help="Item counts for the parse, highlight, dedup and pdf stages")
+    parser.add_argument("--pdf-max-size", type=int, default=PDF_MAX_SIZE,
+                        help="Skip pdf runs above this many items (default: %(default)s)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc runs")
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument("--record", action="store_true", help="Refresh the RSS fixtures from the live feeds and exit")
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixtures()
+        return
+
+    results = []
+    print(f"{'stage':<16}{'items':>9}{'seconds':>10}{'items/s':>12}{'peak MB':>10}")
+    for stage in args.stages:
+        sizes = args.sizes if stage in CORPUS_STAGES else [None]
+        for size in sizes:
+            if stage == "pdf" and size > args.pdf_max_size:
+                print(f"{stage:<16}{size:>9}   skipped (above --pdf-max-size)")
+                continue
+            count, elapsed, _ = run_isolated(stage, size, trace=False)
+            peak = None if args.no_memory else run_isolated(stage, size, trace=True)[2]
+            results.append({"stage": stage, "items": count, "seconds": elapsed,
+                            "items_per_second": count / elapsed if elapsed else None,
+                            "peak_bytes": peak})
+            peak_text = f"{peak / 2 ** 20:>10.1f}" if peak is not None else f"{'-':>10}"
+            print(f"{stage:<16}{count:>9}{elapsed:>10.3f}{count / elapsed:>12.0f}{peak_text}", flush=True)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"python": sys.version.split()[0], "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
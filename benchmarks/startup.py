@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Measure cold-start and rerun latency of the news scraper app.
+
+Runs the Streamlit script headlessly with streamlit's AppTest, once cold and
+then a number of reruns (what every widget interaction costs), and reports
+which heavy optional libraries ended up imported.
+
+Usage:
+    python benchmarks/startup.py [path/to/ai_news2.py] [--reruns N]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["sklearn", "scipy", "reportlab", "bs4"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure ai_news2.py startup and rerun latency")
+    parser.add_argument("app", nargs="?", default=os.path.join(ROOT, "ai_news2.py"))
+    parser.add_argument("--reruns", type=int, default=5)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(args.app)))
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(args.app, default_timeout=120)
+
+    start = time.perf_counter()
+    app.run()
+    cold = time.perf_counter() - start
+
+    reruns = []
+    for _ in range(args.reruns):
+        start = time.perf_counter()
+        app.run()
+        reruns.append(time.perf_counter() - start)
+
+    if app.exception:
+        print(f"App raised: {[e.value for e in app.exception]}")
+    print(f"cold start:   {cold * 1000:8.1f} ms")
+    print(f"rerun median: {statistics.median(reruns) * 1000:8.1f} ms  (n={len(reruns)})")
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+    print(f"heavy modules imported: {', '.join(loaded) if loaded else 'none'}")
+
+
+if __name__ == "__main__":
+    main()
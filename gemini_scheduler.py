@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+Process-wide scheduler for Gemini requests.
+
+Every Gemini call in the app goes through one GeminiScheduler, which reuses a
+single model handle, keeps the request rate under a token-bucket limit, caps
+the number of requests in flight and retries quota errors with backoff.
+Requests are sent with the SDK's async client from one event loop running in
+a background thread, so a burst of independent prompts waits on the API
+concurrently instead of holding a thread each; the blocking methods submit
+to that loop and wait for the result.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+from google.generativeai import GenerativeModel
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = 'gemini-1.5-flash-latest'
+# Free-tier flash limits are 15 requests per minute; the bucket allows short bursts
+REQUESTS_PER_MINUTE = 15
+BURST = 5
+# Requests awaiting a reply cost no thread, so the rate limit rather than this is the usual bound
+MAX_IN_FLIGHT = 8
+MAX_RETRIES = 3
+BACKOFF_BASE = 2.0
+DEFAULT_TIMEOUT = 60
+
+# Errors worth retrying: quota/rate limiting and transient server trouble
+RETRYABLE_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.TooManyRequests,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+)
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at ``rate`` tokens per second."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Take one token if one is available and return 0, otherwise return the seconds until one will be."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        """Take one token, sleeping until one is available."""
+        while (wait := self.reserve()) > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Take one token, yielding to the event loop until one is available."""
+        while (wait := self.reserve()) > 0:
+            await asyncio.sleep(wait)
+
+
+def response_text(response):
+    """Concatenated text of a Gemini response's first candidate ("" when there is none)."""
+    if response.candidates:
+        try:
+            return "".join(part.text for part in response.candidates[0].content.parts).strip()
+        except (AttributeError, IndexError):
+            pass
+    return ""
+
+
+def is_retryable(error):
+    """True for quota and transient errors that a later retry may get past."""
+    if isinstance(error, RETRYABLE_ERRORS):
+        return True
+    message = str(error).lower()
+    return "429" in message or "quota" in message or "resource has been exhausted" in message
+
+
+class GeminiScheduler:
+    """Rate-limited, concurrency-limited access to one Gemini model."""
+
+    def __init__(self, model_name=MODEL_NAME, requests_per_minute=REQUESTS_PER_MINUTE, burst=BURST,
+                 max_in_flight=MAX_IN_FLIGHT, max_retries=MAX_RETRIES, backoff_base=BACKOFF_BASE):
+        """
+        Create a scheduler. Gemini must already be configured (genai.configure).
+
+        Args:
+            model_name: Gemini model used for every request
+            requests_per_minute: Sustained request rate allowed by the token bucket
+            burst: Number of requests that may be sent back to back
+            max_in_flight: Maximum number of requests waiting on the API at once
+            max_retries: Retries for quota and transient errors
+            backoff_base: Base of the exponential backoff between retries, in seconds
+        """
+        self.model_name = model_name
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._bucket = TokenBucket(requests_per_minute / 60.0, burst)
+        # Only ever used on the scheduler's own loop
+        self._in_flight = asyncio.BoundedSemaphore(max_in_flight)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="gemini-loop", daemon=True)
+        self._thread.start()
+
+    @property
+    def model(self):
+        """The shared GenerativeModel handle, created on first use."""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    self._model = GenerativeModel(self.model_name)
+        return self._model
+
+    async def generate_async(self, prompt, max_output_tokens=None, temperature=None, timeout=DEFAULT_TIMEOUT,
+                             **config):
+        """
+        Send one request and return the raw response. Must be awaited on the scheduler's loop (see run).
+
+        Extra keyword arguments are passed to GenerationConfig (e.g. response_mime_type).
+        Quota and transient errors are retried with exponential backoff and jitter;
+        the last error is raised once the retries are used up. ``timeout`` is the
+        deadline for the whole call, from its first attempt to its last retry;
+        time spent waiting for the rate limit is not counted.
+        """
+        generation_config = genai.types.GenerationConfig(
+            max_output_tokens=max_output_tokens, temperature=temperature, **config)
+        loop = asyncio.get_running_loop()
+        deadline = None
+        for attempt in range(self.max_retries + 1):
+            await self._bucket.acquire_async()
+            async with self._in_flight:
+                if deadline is None:
+                    deadline = loop.time() + timeout
+                remaining = deadline - loop.time()
+                try:
+                    return await asyncio.wait_for(self.model.generate_content_async(
+                        prompt,
+                        generation_config=generation_config,
+                        request_options={'timeout': remaining}
+                    ), remaining)
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"Gemini did not answer within {timeout}s") from None
+                except Exception as e:
+                    if attempt == self.max_retries or not is_retryable(e):
+                        raise
+                    error = e
+            delay = self.backoff_base * (2 ** attempt) * (0.5 + random.random())
+            if loop.time() + delay >= deadline:
+                raise error
+            logger.warning(f"Gemini request failed ({error}); retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def generate_text_async(self, prompt, **kwargs):
+        """Like generate_async, but return the text of the first candidate."""
+        return response_text(await self.generate_async(prompt, **kwargs))
+
+    async def map_text_async(self, prompts, max_concurrency=None, **kwargs):
+        """
+        Send independent prompts concurrently and return their texts in order.
+
+        Args:
+            prompts: Prompts to send
+            max_concurrency: Optional cap on this call's requests in flight at once
+                (the scheduler's own limits always apply)
+            **kwargs: Passed to generate_async for every prompt
+
+        Returns:
+            One text per prompt; a failed prompt's slot holds its exception instead
+        """
+        limit = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+        async def generate_one(prompt):
+            if limit is None:
+                return await self.generate_text_async(prompt, **kwargs)
+            async with limit:
+                return await self.generate_text_async(prompt, **kwargs)
+
+        return await asyncio.gather(*(generate_one(prompt) for prompt in prompts), return_exceptions=True)
+
+    def run(self, coroutine):
+        """Run a coroutine on the scheduler's loop and block until it finishes."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def close(self):
+        """Cancel the requests still pending, then stop the event loop and its thread."""
+        if self._loop.is_closed():
+            return
+
+        async def cancel_pending():
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(cancel_pending(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def generate(self, prompt, **kwargs):
+        """Send one request and return the raw response, blocking until it completes (see generate_async)."""
+        return self.run(self.generate_async(prompt, **kwargs))
+
+    def generate_text(self, prompt, **kwargs):
+        """Like generate, but return the text of the first candidate."""
+        return self.run(self.generate_text_async(prompt, **kwargs))
+
+    def submit(self, prompt, **kwargs):
+        """Queue a request and return a Future of its response."""
+        return asyncio.run_coroutine_threadsafe(self.generate_async(prompt, **kwargs), self._loop)
+
+    def submit_text(self, prompt, **kwargs):
+        """Queue a request and return a Future of its text."""
+        return asyncio.run_coroutine_threadsafe(self.generate_text_async(prompt, **kwargs), self._loop)
+
+    def map_text(self, prompts, max_concurrency=None, **kwargs):
+        """
+        Run independent prompts concurrently and return their texts in order.
+
+        A failed prompt's slot holds its exception instead of a text. A burst
+        of prompts takes about as long as its slowest request while it fits
+        in the rate and in-flight limits.
+        """
+        return self.run(self.map_text_async(prompts, max_concurrency=max_concurrency, **kwargs))
+
+
+def get_scheduler():
+    """Return the process-wide scheduler, creating it on first use."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = GeminiScheduler()
+    return _scheduler
+
+
+def configure_scheduler(**kwargs):
+    """Replace the process-wide scheduler with one built from ``kwargs`` (see GeminiScheduler), closing the old one."""
+    global _scheduler
+    with _scheduler_lock:
+        previous, _scheduler = _scheduler, GeminiScheduler(**kwargs)
+    if previous is not None:
+        previous.close()
+    return _scheduler
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+Multi-keyword matching used for abuse detection and highlighting.
+
+TokenMatcher matches whole words: the text is split into tokens that keep
+combining marks (Devanagari and Kannada matras, viramas, nuktas) inside the
+word, each token is normalized (NFC, case-folded, without zero-width joiners)
+and looked up in a table built from the keywords. KeywordMatcher is a
+single-pass Aho-Corasick automaton for substrings such as the phrases an AI
+model reports.
+"""
+import re
+import unicodedata
+from collections import deque
+from functools import lru_cache
+
+# Zero-width (non-)joiners pick glyph forms inside Indic words without changing the word
+JOINERS = "\u200c\u200d"
+
+
+def _fold(ch):
+    """Lower-case a character without changing the length of the text."""
+    lowered = ch.lower()
+    return lowered if len(lowered) == 1 else ch
+
+
+def fold_text(text):
+    """Lower-case ``text`` so that every index still lines up with the original."""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(_fold(ch) for ch in text)
+
+
+def is_word_char(ch):
+    """
+    Word characters for boundary checks.
+
+    Unlike ``re``'s ``\\w`` this counts combining marks (Devanagari and Kannada
+    matras, viramas, nuktas) as part of the word, so terms such as "हत्या" or
+    "ಹತ್ಯೆ" are not split in the middle.
+    """
+    return ch.isalnum() or ch == "_" or unicodedata.category(ch).startswith("M")
+
+
+@lru_cache(maxsize=None)
+def token_pattern():
+    """Regex of one token: word characters, combining marks and joiners (built once, on first use)."""
+    ranges = []
+    start = None
+    # Combining marks of the Basic Multilingual Plane, which holds every Indic script block
+    for codepoint in range(0x300, 0x10000):
+        is_mark = unicodedata.category(chr(codepoint)).startswith("M")
+        if is_mark and start is None:
+            start = codepoint
+        elif not is_mark and start is not None:
+            ranges.append(f"\\u{start:04x}-\\u{codepoint - 1:04x}")
+            start = None
+    return re.compile(f"[\\w{''.join(ranges)}{JOINERS}]+")
+
+
+@lru_cache(maxsize=65536)
+def normalize_token(token):
+    """Matching key of a token: NFC, case-folded, with zero-width joiners removed."""
+    key = unicodedata.normalize("NFC", token).casefold()
+    if "\u200c" in key or "\u200d" in key:
+        key = key.replace("\u200c", "").replace("\u200d", "")
+    return key
+
+
+def tokenize(text):
+    """Return ``(start, end, key)`` for every token of ``text``; offsets index the original text."""
+    return [(match.start(), match.end(), normalize_token(match.group())) for match in token_pattern().finditer(text)]
+
+
+class TokenMatcher:
+    """Whole-word keyword matcher taking one dictionary probe per token of the text."""
+
+    def __init__(self, keywords):
+        """
+        Build the token table.
+
+        Args:
+            keywords: Iterable of keywords or multi-word phrases (duplicates and empty strings are ignored)
+        """
+        self.keywords = sorted({k for k in keywords if k})
+        # First token key -> [(keys of the following tokens, keyword)], longest phrase first
+        self._table = {}
+        for keyword in self.keywords:
+            keys = tuple(key for _, _, key in tokenize(keyword))
+            if keys:
+                self._table.setdefault(keys[0], []).append((keys[1:], keyword))
+        for candidates in self._table.values():
+            candidates.sort(key=lambda candidate: -len(candidate[0]))
+
+    def __bool__(self):
+        return bool(self._table)
+
+    def _match_at(self, tokens, i):
+        candidates = self._table.get(tokens[i][2])
+        if candidates:
+            for rest, keyword in candidates:
+                end = i + 1 + len(rest)
+                if end <= len(tokens) and all(tokens[i + 1 + k][2] == key for k, key in enumerate(rest)):
+                    return end, keyword
+        return None
+
+    def _may_match(self, text):
+        # Most texts hold no keyword at all: probe every token's key before working out any offsets
+        return not self._table.keys().isdisjoint(map(normalize_token, token_pattern().findall(text)))
+
+    def find_spans(self, text):
+        """Return non-overlapping ``(start, end, keyword)`` matches, leftmost-longest."""
+        if not text or not self._table or not self._may_match(text):
+            return []
+        tokens = tokenize(text)
+        spans = []
+        i = 0
+        while i < len(tokens):
+            match = self._match_at(tokens, i)
+            if match is None:
+                i += 1
+                continue
+            end, keyword = match
+            spans.append((tokens[i][0], tokens[end - 1][1], keyword))
+            i = end
+        return spans
+
+    def search(self, text):
+        """Return True if any keyword matches ``text``."""
+        if not text or not self._table or not self._may_match(text):
+            return False
+        tokens = tokenize(text)
+        return any(tokens[i][2] in self._table and self._match_at(tokens, i) for i in range(len(tokens)))
+
+
+class KeywordMatcher:
+    """Case-insensitive Aho-Corasick automaton over a fixed keyword list."""
+
+    def __init__(self, keywords, whole_words=True):
+        """
+        Build the automaton.
+
+        Args:
+            keywords: Iterable of keywords (duplicates and empty strings are ignored)
+            whole_words: Only report matches that start and end on a word boundary
+        """
+        self.whole_words = whole_words
+        self.keywords = sorted({k for k in keywords if k})
+        self._lengths = [len(k) for k in self.keywords]
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for ch in fold_text(keyword):
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                state = nxt
+            self._out[state] = self._out[state] + (index,)
+
+        # Breadth-first pass to wire failure links and merge suffix outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def __bool__(self):
+        return bool(self.keywords)
+
+    def _raw_matches(self, text):
+        goto, fail, out, lengths = self._goto, self._fail, self._out, self._lengths
+        state = 0
+        for pos, ch in enumerate(fold_text(text)):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                end = pos + 1
+                for index in out[state]:
+                    yield end - lengths[index], end, index
+
+    def _on_boundary(self, text, start, end):
+        if start > 0 and is_word_char(text[start - 1]) and is_word_char(text[start]):
+            return False
+        if end < len(text) and is_word_char(text[end]) and is_word_char(text[end - 1]):
+            return False
+        return True
+
+    def find_spans(self, text):
+        """
+        Return non-overlapping ``(start, end, keyword)`` matches in one pass over ``text``.
+
+        Overlaps are resolved leftmost-longest, which is what a regex
+        alternation of the keywords sorted by length would produce.
+        """
+        if not text or not self.keywords:
+            return []
+        matches = [m for m in self._raw_matches(text)
+                   if not self.whole_words or self._on_boundary(text, m[0], m[1])]
+        matches.sort(key=lambda m: (m[0], -m[1]))
+        spans = []
+        last_end = 0
+        for start, end, index in matches:
+            if start >= last_end:
+                spans.append((start, end, self.keywords[index]))
+                last_end = end
+        return spans
+
+    def search(self, text):
+        """Return True as soon as any keyword matches ``text``."""
+        if not text or not self.keywords:
+            return False
+        if not self.whole_words:
+            return next(self._raw_matches(text), None) is not None
+        return any(self._on_boundary(text, start, end) for start, end, _ in self._raw_matches(text))
+
+
+def merge_spans(*span_lists):
+    """Merge span lists, earlier lists winning where spans overlap."""
+    merged = []
+    for spans in span_lists:
+        for span in spans:
+            if all(span[1] <= s[0] or span[0] >= s[1] for s in merged):
+                merged.append(span)
+    merged.sort()
+    return merged
+
+
+def apply_spans(text, spans, wrap, escape=None):
+    """
+    Rebuild ``text`` with every span passed through ``wrap``.
+
+    Args:
+        text: Original text
+        spans: Sorted, non-overlapping ``(start, end, ...)`` tuples
+        wrap: Callable taking ``(matched_text, span)`` and returning the replacement
+        escape: Optional callable applied to the text between spans
+    """
+    if escape is None:
+        escape = str
+    if not spans:
+        return escape(text)
+    parts = []
+    last = 0
+    for span in spans:
+        start, end = span[0], span[1]
+        parts.append(escape(text[last:start]))
+        parts.append(wrap(text[start:end], span))
+        last = end
+    parts.append(escape(text[last:]))
+    return "".join(parts)
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""Gemini trend analysis of news items, with finished analyses cached on disk."""
+import hashlib
+import logging
+import threading
+import time
+
+from gemini_scheduler import MODEL_NAME, get_scheduler, response_text
+from news_cache import DiskCache, cache_path
+
+logger = logging.getLogger(__name__)
+
+# Number of items sent for trend analysis, and how many finished analyses are kept on disk
+ANALYSIS_ITEMS = 15
+ANALYSIS_CACHE_SIZE = 500
+
+_analysis_cache = None
+_cache_lock = threading.Lock()
+
+
+def build_analysis_prompt(news_summary):
+    """Prompt for the trend analysis of a block of news summaries"""
+    return f"""Please analyze the following news headlines and descriptions. Provide a concise analysis covering these points:
+
+1.  **Main Themes:** What are the 2-3 dominant topics or themes emerging from these news items?
+2.  **Key Trends/Patterns:** Are there any noticeable trends, recurring events, or patterns?
+3.  **Potential Bias/Perspective:** Briefly comment if any significant bias or specific viewpoint is apparent from the headlines provided (acknowledge limitations if based only on headlines).
+4.  **Regional/Global Impact:** Briefly mention any potential wider implications (regional or global) suggested by the news.
+
+Keep the overall analysis brief, insightful, and structured (e.g., use bullet points or numbered lists for clarity).
+
+**News Items for Analysis:**
+---
+{news_summary}
+---
+**Your Analysis:**
+"""
+
+
+def analysis_cache_key(news_items):
+    """Cache key for an analysis: the ordered hashes of the analyzed items plus the model and prompt version"""
+    prompt_version = f"{MODEL_NAME}\n{build_analysis_prompt('{news_summary}')}"
+    item_hashes = "\n".join(item["hash"] for item in news_items[:ANALYSIS_ITEMS])
+    return hashlib.sha1(f"{prompt_version}\n{item_hashes}".encode("utf-8")).hexdigest()
+
+
+def get_analysis_cache():
+    """Persistent cache of finished analyses, shared by every session and process"""
+    global _analysis_cache
+    if _analysis_cache is None:
+        with _cache_lock:
+            if _analysis_cache is None:
+                _analysis_cache = DiskCache(cache_path("analyses.sqlite"), max_entries=ANALYSIS_CACHE_SIZE)
+    return _analysis_cache
+
+
+def analyze_with_gemini(news_items, on_error=logger.warning):
+    """Analyze news items using Google's Gemini API.
+
+    Gemini must already be configured (genai.configure) by the caller. Problems
+    are reported through on_error (e.g. st.error in the app) and described in
+    the returned text.
+    """
+    try:
+        items_for_analysis = news_items[:ANALYSIS_ITEMS]  # Analyze top 15 items
+        if not items_for_analysis:
+            return "No news items provided for analysis."
+
+        news_summary = "\n\n".join([
+            f"Title: {item['title']}\nSource: {item['source']}\nDescription: {item.get('description', 'No description available')}"
+            for item in items_for_analysis
+        ]).strip()
+        if not news_summary:
+            return "Could not generate summary from provided news items."
+
+        prompt = build_analysis_prompt(news_summary)
+        response = get_scheduler().generate(prompt, max_output_tokens=800, temperature=0.6, timeout=120)
+
+        analysis_text = response_text(response)
+        if not analysis_text and hasattr(response, 'text'):
+            analysis_text = response.text.strip()
+        if not analysis_text and response.parts:
+            analysis_text = "".join(part.text for part in response.parts).strip()
+
+        if not analysis_text and hasattr(response, 'prompt_feedback') and response.prompt_feedback.block_reason:
+            reason = response.prompt_feedback.block_reason
+            on_error(f"Gemini analysis blocked. Reason: {reason}")
+            return f"Analysis blocked by safety settings or content policy: {reason}"
+        elif not analysis_text:
+            on_error("Gemini returned an empty response.")
+            return "Gemini returned an empty response. The prompt might need adjustment or the model could not generate content."
+
+        # Only real analyses are cached; error messages are retried next time
+        try:
+            get_analysis_cache().set(analysis_cache_key(news_items), {"text": analysis_text, "created": time.time()})
+        except Exception as e:
+            logger.warning(f"Could not cache the analysis: {e}")
+        return analysis_text
+
+    except Exception as e:
+        on_error(f"Error during Gemini API call: {str(e)}")
+        if isinstance(e, TimeoutError):
+            return "Gemini API call timed out. Try reducing the number of articles analyzed or check network."
+        if "API key not valid" in str(e):
+            return "Invalid Gemini API Key."
+        elif "quota" in str(e).lower():
+            return "Gemini API Quota exceeded."
+        elif "resource has been exhausted" in str(e).lower():
+            return "Gemini API resources exhausted (quota)."
+        elif "model" in str(e).lower() and ("not found" or "does not exist") in str(e).lower():
+            return f"Gemini Model not found or unavailable."
+        elif "DeadlineExceeded" in str(e) or "timed out" in str(e).lower():
+            return "Gemini API call timed out. Try reducing the number of articles analyzed or check network."
+        return f"An unexpected error occurred with Gemini: {str(e)}"
+
+
+def get_cached_analysis(news_items):
+    """Return the cached analysis of exactly these items as ``{"text", "created"}``, or None"""
+    try:
+        return get_analysis_cache().get(analysis_cache_key(news_items))
+    except Exception as e:
+        logger.warning(f"Could not read the analysis cache: {e}")
+        return None
+
+
+def analyze_news(news_items, on_error=logger.warning):
+    """Analyze news using the Gemini AI model.
+
+    Returns (analysis_text, cached_at), where cached_at is the time a cached
+    analysis of the same items was made, or None for a fresh analysis.
+    """
+    if not news_items:
+        return "No news items to analyze. Please fetch news first.", None
+    cached = get_cached_analysis(news_items)
+    if cached:
+        return cached["text"], cached["created"]
+    return analyze_with_gemini(news_items, on_error), None
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Optional full-article stage: download the page behind every news link and
+extract its main text.
+
+Pages are fetched from an asyncio event loop with a global cap on requests in
+flight and a smaller cap per host, so each site sees a short burst of
+parallel requests instead of one long queue, and the whole stage takes about
+one round trip per batch of MAX_PER_HOST links on the busiest host.
+Extracted bodies are cached on disk by URL.
+"""
+import asyncio
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from news_cache import DiskCache, cache_path
+from news_fetch import FEED_TIMEOUT, get_session
+from news_timing import NO_TIMINGS
+from sarkari_crawler import HTML_PARSER
+
+logger = logging.getLogger(__name__)
+
+MAX_ARTICLE_REQUESTS = 16
+# Politeness limit: requests to the same host in flight at once
+MAX_PER_HOST = 4
+# Extracted bodies are cut to this many characters
+MAX_BODY_CHARS = 20000
+# Paragraphs shorter than this are usually captions, bylines or share links
+MIN_PARAGRAPH_CHARS = 40
+
+# Article pages rarely change once published; keep bodies for a week
+ARTICLE_TTL = 7 * 24 * 3600
+ARTICLE_CACHE_SIZE = 20000
+
+# Page furniture that never holds article text
+NOISE_TAGS = ["script", "style", "noscript", "template", "svg", "nav", "header", "footer", "aside", "form",
+              "iframe", "figure", "button"]
+WHITESPACE = re.compile(r"\s+")
+
+_article_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_article_cache():
+    """Return the persistent cache of extracted article bodies, keyed by URL."""
+    global _article_cache
+    if _article_cache is None:
+        with _cache_lock:
+            if _article_cache is None:
+                _article_cache = DiskCache(cache_path("articles.sqlite"), ttl=ARTICLE_TTL,
+                                           max_entries=ARTICLE_CACHE_SIZE)
+    return _article_cache
+
+
+def paragraph_text(element):
+    return WHITESPACE.sub(" ", element.get_text(" ", strip=True))
+
+
+def extract_article_text(html, max_chars=MAX_BODY_CHARS):
+    """
+    Extract the main text of an article page.
+
+    Uses the page's ``<article>`` (or ``itemprop="articleBody"``) element when
+    there is one, otherwise the element whose direct ``<p>`` children hold the
+    most text. Returns "" when no paragraphs are found.
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, HTML_PARSER)
+    for tag in soup(NOISE_TAGS):
+        tag.decompose()
+
+    container = soup.find(attrs={"itemprop": "articleBody"}) or soup.find("article")
+    if container is None:
+        # Score every paragraph's parent by the text of its paragraphs and keep the best one
+        parents, scores = {}, {}
+        for paragraph in soup.find_all("p"):
+            parent = paragraph.parent
+            parents[id(parent)] = parent
+            scores[id(parent)] = scores.get(id(parent), 0) + len(paragraph_text(paragraph))
+        if not scores:
+            return ""
+        container = parents[max(scores, key=scores.get)]
+
+    paragraphs = [paragraph_text(paragraph) for paragraph in container.find_all("p")]
+    text = "\n\n".join(paragraph for paragraph in paragraphs if len(paragraph) >= MIN_PARAGRAPH_CHARS)
+    if not text:
+        text = paragraph_text(container)
+    return text[:max_chars]
+
+
+def fetch_article(url, timeout=FEED_TIMEOUT):
+    """Download one article page over the shared keep-alive session and extract its text."""
+    response = get_session().get(url, timeout=timeout)
+    response.raise_for_status()
+    if "html" not in response.headers.get("Content-Type", "text/html"):
+        return ""
+    return extract_article_text(response.content)
+
+
+async def _fetch_articles(urls, max_requests, max_per_host, timeout, timings):
+    loop = asyncio.get_running_loop()
+    host_limits = {}
+    results = {}
+
+    # The pooled requests session does the I/O on the executor's threads; the loop enforces the limits
+    with ThreadPoolExecutor(max_workers=max_requests, thread_name_prefix="article") as executor:
+        async def fetch_one(url):
+            host = urlsplit(url).netloc
+            limit = host_limits.setdefault(host, asyncio.Semaphore(max_per_host))
+            async with limit:
+                source_timings = timings.for_source(host)
+                try:
+                    with source_timings.stage("article_download"):
+                        results[url] = (await loop.run_in_executor(executor, fetch_article, url, timeout), None)
+                except Exception as e:
+                    source_timings.count("article_download", "errors")
+                    results[url] = (None, e)
+
+        await asyncio.gather(*(fetch_one(url) for url in urls))
+    return results
+
+
+def fetch_article_bodies(urls, max_requests=MAX_ARTICLE_REQUESTS, max_per_host=MAX_PER_HOST,
+                         timeout=FEED_TIMEOUT, use_cache=True, on_error=logger.warning, timings=NO_TIMINGS):
+    """
+    Fetch the main text of many article pages concurrently.
+
+    Args:
+        urls: Article URLs (duplicates and empty strings are ignored)
+        max_requests: Maximum number of pages downloaded at once
+        max_per_host: Maximum number of pages downloaded at once from a single host
+        timeout: requests timeout for each page
+        use_cache: Serve and store bodies through the persistent article cache
+        on_error: Callable receiving one message per host with pages that could not be fetched
+        timings: Optional StageTimings receiving per-host download times
+
+    Returns:
+        Dict mapping every fetched URL to its text; failed pages are left out
+    """
+    urls = list(dict.fromkeys(url for url in urls if url))
+    cache = get_article_cache() if use_cache else None
+    bodies = cache.get_many(urls) if cache is not None else {}
+    timings.count("article_download", "cached", len(bodies))
+
+    pending = [url for url in urls if url not in bodies]
+    if pending:
+        fresh = {}
+        failures = {}
+        results = asyncio.run(_fetch_articles(pending, max(1, max_requests), max(1, max_per_host), timeout, timings))
+        for url in pending:
+            text, error = results[url]
+            if error is not None:
+                failures.setdefault(urlsplit(url).netloc, []).append(error)
+            else:
+                fresh[url] = text
+        # One message per host, so an unreachable site doesn't produce a warning per link
+        for host, errors in failures.items():
+            on_error(f"Could not fetch {len(errors)} article(s) from {host}: {errors[0]}")
+        bodies.update(fresh)
+        if cache is not None and fresh:
+            cache.set_many(fresh)
+    return bodies
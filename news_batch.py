@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+Headless batch reports.
+
+Builds the same reports as the Streamlit app (news list, duplicate coverage,
+optional Gemini analysis, PDF) for every language and date window in one run,
+with one worker process per report, and writes PDF and JSON files.
+
+Usage:
+    python news_batch.py --out reports                      # en/hi/kn, today and this week
+    python news_batch.py --windows today 2025-03-14 --ai --analyze --out reports
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime
+
+from news_ingest import configure_gemini
+from news_pipeline import (
+    NEWS_SOURCES, fetch_rss_news, iter_sarkari_news, add_article_bodies, apply_ai_abuse_analysis, news_sort_key,
+)
+
+logger = logging.getLogger(__name__)
+
+LANGUAGES = sorted({source["language"] for source in NEWS_SOURCES})
+# Named windows and how many days back they reach; any other window is an ISO date
+WINDOWS = {"today": 1, "week": 7}
+DEFAULT_WINDOWS = ["today", "week"]
+
+
+def parse_window(window):
+    """Return ``(days_back, day)`` for a window name or an ISO date (``day`` is None for named windows)."""
+    if window in WINDOWS:
+        return WINDOWS[window], None
+    day = date.fromisoformat(window)
+    return (date.today() - day).days + 1, day
+
+
+def window_title(window, day):
+    """Date shown in a report's title, like the app's."""
+    if day is None:
+        return "Today's Latest News" if window == "today" else "This Week's Latest News"
+    suffix = "th" if 11 <= day.day <= 13 else {1: "st", 2: "nd", 3: "rd"}.get(day.day % 10, "th")
+    return f"{day.day}{suffix} {day.strftime('%B').lower()}, {day.year}"
+
+
+def fetch_window(language, window, search_keyword=None, use_ai_analysis=False, fetch_bodies=False):
+    """Fetch the deduplicated, date-sorted news of one language and window."""
+    days_back, day = parse_window(window)
+    # Reports already run one per process, so each parses its feeds itself rather than starting a parse pool
+    news_items = fetch_rss_news(language, days_back, search_keyword, use_ai_analysis, fetch_bodies=fetch_bodies,
+                                parse_in_processes=False)
+    if day is not None:
+        # RSS items of that day only, plus the Sarkari Pariksha page of the day
+        news_items = [news for news in news_items if news["pub_date"] and news["pub_date"].date() == day]
+        seen_hashes = {news["hash"] for news in news_items}
+        for _, _, sarkari_news in iter_sarkari_news([language], day, day, search_keyword, seen_hashes):
+            if fetch_bodies:
+                add_article_bodies(sarkari_news, language)
+            if use_ai_analysis:
+                apply_ai_abuse_analysis(sarkari_news)
+            news_items = sorted(news_items + sarkari_news, key=news_sort_key)
+    return news_items
+
+
+def build_report(language, window, out_dir, formats, search_keyword=None, use_ai_analysis=False, analyze=False,
+                 fetch_bodies=False):
+    """
+    Fetch, analyze and write one report.
+
+    Returns:
+        Dict summarising the report: language, window, item count, written paths and seconds taken
+    """
+    from news_dedup import find_duplicate_news
+
+    start = time.time()
+    news_items = fetch_window(language, window, search_keyword, use_ai_analysis, fetch_bodies)
+    duplicates = find_duplicate_news(news_items) if news_items else {}
+
+    analysis_text = None
+    if analyze and news_items:
+        from news_analysis import analyze_news
+        errors = []
+        analysis_text, _ = analyze_news(news_items, on_error=errors.append)
+        if errors:
+            # Leave the analysis out of the report rather than printing the error text as one
+            logger.warning(f"{language}/{window}: trend analysis failed: {errors[0]}")
+            analysis_text = None
+
+    base = os.path.join(out_dir, f"news_report_{language}_{window}" + (f"_{search_keyword}" if search_keyword else ""))
+    paths = []
+    if "json" in formats:
+        report = {
+            "language": language,
+            "window": window,
+            "search_keyword": search_keyword,
+            "generated": datetime.now().isoformat(),
+            "news": news_items,
+            "duplicates": [[first] + others for first, others in duplicates.items()],
+            "analysis": analysis_text,
+        }
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2,
+                      default=lambda value: value.isoformat() if isinstance(value, datetime) else str(value))
+        paths.append(base + ".json")
+    if "pdf" in formats:
+        from pdf_report import generate_pdf
+        with open(base + ".pdf", "wb") as f:
+            generate_pdf(news_items, window_title(window, parse_window(window)[1]), language, search_keyword,
+                         analysis_text, output=f)
+        paths.append(base + ".pdf")
+
+    return {"language": language, "window": window, "items": len(news_items), "paths": paths,
+            "seconds": time.time() - start}
+
+
+def init_worker(use_gemini, workers):
+    """Process pool initializer: give each worker its share of the Gemini quota."""
+    if use_gemini and configure_gemini():
+        from gemini_scheduler import REQUESTS_PER_MINUTE, configure_scheduler
+        configure_scheduler(requests_per_minute=REQUESTS_PER_MINUTE / workers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build news reports for several languages and date windows")
+    parser.add_argument("--languages", nargs="+", default=LANGUAGES, choices=LANGUAGES)
+    parser.add_argument("--windows", nargs="+", default=DEFAULT_WINDOWS,
+                        help="'today', 'week' or an ISO date (YYYY-MM-DD) per report (default: today week)")
+    parser.add_argument("--search", help="Only keep items matching this keyword")
+    parser.add_argument("--ai", action="store_true", help="Classify items with Gemini batch abuse analysis")
+    parser.add_argument("--articles", action="store_true",
+                        help="Download every item's full article text for abuse detection (kept in the JSON)")
+    parser.add_argument("--analyze", action="store_true", help="Add a Gemini trend analysis to every report")
+    parser.add_argument("--formats", nargs="+", default=["pdf", "json"], choices=["pdf", "json"])
+    parser.add_argument("--out", default="reports", help="Output directory (default: reports)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    for window in args.windows:
+        try:
+            parse_window(window)
+        except ValueError:
+            parser.error(f"invalid window {window!r}: use today, week or YYYY-MM-DD")
+    os.makedirs(args.out, exist_ok=True)
+
+    jobs = [(language, window) for language in args.languages for window in args.windows]
+    workers = max(1, min(args.workers, len(jobs)))
+    use_gemini = args.ai or args.analyze
+    if use_gemini and not configure_gemini():
+        parser.error("--ai and --analyze need GEMINI_API_KEY (environment or .env)")
+    started = time.time()
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(use_gemini, workers)) as pool:
+        futures = {pool.submit(build_report, language, window, args.out, args.formats, args.search, args.ai,
+                               args.analyze, args.articles): (language, window)
+                   for language, window in jobs}
+        for future in as_completed(futures):
+            language, window = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                failed += 1
+                logger.error(f"{language}/{window}: report failed: {e}")
+                continue
+            logger.info(f"{language}/{window}: {result['items']} items in {result['seconds']:.1f}s -> "
+                        f"{', '.join(result['paths'])}")
+    logger.info(f"{len(jobs) - failed}/{len(jobs)} reports written to {args.out} in {time.time() - started:.1f}s")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
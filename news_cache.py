@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""Small persistent key/value cache backed by SQLite, shared by the news tools."""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_DIR = os.getenv("NEWS_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".news_cache"))
+
+
+def cache_path(name):
+    """Return the path of a cache database inside CACHE_DIR."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return os.path.join(CACHE_DIR, name)
+
+
+class DiskCache:
+    """JSON values stored under string keys in a single SQLite file, with optional TTL and LRU bound."""
+
+    def __init__(self, path, ttl=None, max_entries=None):
+        """
+        Open (or create) a cache database.
+
+        Args:
+            path: Location of the SQLite file
+            ttl: Seconds after which an entry is treated as missing (None keeps entries forever)
+            max_entries: Evict least recently used entries beyond this count (None for unbounded)
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, updated REAL NOT NULL, accessed REAL NOT NULL DEFAULT 0)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(cache)")}
+        if "accessed" not in columns:
+            self._conn.execute("ALTER TABLE cache ADD COLUMN accessed REAL NOT NULL DEFAULT 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)")
+        self._conn.commit()
+
+    def _is_live(self, updated, now):
+        return self.ttl is None or now - updated <= self.ttl
+
+    def get(self, key, default=None):
+        """Return the value stored under ``key`` or ``default``."""
+        return self.get_many([key]).get(key, default)
+
+    def get_many(self, keys):
+        """Return a dict of the live entries among ``keys``, refreshing their LRU position."""
+        keys = list(keys)
+        if not keys:
+            return {}
+        now = time.time()
+        found = {}
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, value, updated FROM cache WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for key, value, updated in rows:
+                    if self._is_live(updated, now):
+                        found[key] = json.loads(value)
+            if found:
+                self._conn.executemany("UPDATE cache SET accessed = ? WHERE key = ?", [(now, key) for key in found])
+                self._conn.commit()
+        return found
+
+    def set(self, key, value):
+        """Store ``value`` (anything JSON serialisable) under ``key``."""
+        self.set_many({key: value})
+
+    def set_many(self, items):
+        """Store every ``key: value`` pair of ``items`` in one transaction."""
+        if not items:
+            return
+        now = time.time()
+        rows = [(key, json.dumps(value, ensure_ascii=False), now, now) for key, value in items.items()]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO cache (key, value, updated, accessed) VALUES (?, ?, ?, ?)", rows
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now):
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM cache WHERE updated < ?", (now - self.ttl,))
+        if self.max_entries is not None:
+            excess = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed LIMIT ?)", (excess,)
+                )
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""Near-duplicate detection for news titles using sparse TF-IDF vectors and MinHash LSH."""
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# Below this many items an exact sparse similarity join is cheap enough
+EXACT_LIMIT = 2000
+# 16 bands of 4 rows: pairs with token Jaccard >= 0.6 become candidates with ~90% probability
+NUM_BANDS = 16
+ROWS_PER_BAND = 4
+# Candidate rows are verified against their bucket in blocks of at most this many rows
+MAX_BLOCK = 1000
+SIGNATURE_CHUNK = 10000
+
+
+def _similar_pairs(vectors, members, threshold):
+    """
+    Return ``(i, j)`` index arrays (``i < j``) of the pairs among ``members`` whose
+    cosine similarity exceeds ``threshold``. Rows are compared in blocks so a
+    large bucket never materialises a dense matrix.
+    """
+    bucket = vectors[members]
+    row_parts, col_parts = [], []
+    for start in range(0, len(members), MAX_BLOCK):
+        sims = (bucket[start:start + MAX_BLOCK] @ bucket.T).tocoo()
+        rows = sims.row + start
+        mask = (sims.data > threshold) & (sims.col > rows)
+        row_parts.append(members[rows[mask]])
+        col_parts.append(members[sims.col[mask]])
+    return np.concatenate(row_parts), np.concatenate(col_parts)
+
+
+def minhash_signatures(vectors, num_perm=NUM_BANDS * ROWS_PER_BAND, seed=1):
+    """
+    MinHash signatures of the token sets of a CSR matrix.
+
+    Each row's set is its non-zero column indices. Returns a ``(n_rows, num_perm)``
+    uint32 array; rows without tokens get the maximum value in every slot.
+    """
+    # Multiply-shift hashing: (a * x + b) >> 32 with random odd 64-bit a, no modulo needed
+    rng = np.random.default_rng(seed)
+    a = rng.integers(0, np.iinfo(np.uint64).max, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, np.iinfo(np.uint64).max, size=num_perm, dtype=np.uint64)
+
+    n_rows = vectors.shape[0]
+    signatures = np.full((n_rows, num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+    indptr, indices = vectors.indptr, vectors.indices.astype(np.uint64)
+    for start in range(0, n_rows, SIGNATURE_CHUNK):
+        stop = min(start + SIGNATURE_CHUNK, n_rows)
+        lo, hi = indptr[start], indptr[stop]
+        if lo == hi:
+            continue
+        hashes = ((indices[lo:hi, None] * a + b) >> np.uint64(32)).astype(np.uint32)
+        lengths = np.diff(indptr[start:stop + 1])
+        rows = np.flatnonzero(lengths) + start
+        # reduceat over the start offset of each non-empty row
+        signatures[rows] = np.minimum.reduceat(hashes, indptr[rows] - lo, axis=0)
+    return signatures
+
+
+def _bucket_pairs(order, starts, size):
+    """Every ``(i, j)`` pair within each bucket of ``size`` members starting at ``starts`` in ``order``."""
+    members = order[starts[:, None] + np.arange(size)]
+    i, j = np.triu_indices(size, k=1)
+    return members[:, i].ravel(), members[:, j].ravel()
+
+
+def candidate_pairs(signatures, bands=NUM_BANDS, rows=ROWS_PER_BAND):
+    """
+    Find rows that share at least one LSH band.
+
+    Returns:
+        ``(pairs, large_buckets)``: a ``(k, 2)`` array of unique candidate pairs
+        with ``i < j``, and a list of buckets too large to expand into pairs
+    """
+    n = np.int64(signatures.shape[0])
+    valid = np.flatnonzero(signatures[:, 0] != np.iinfo(np.uint32).max)
+    multipliers = (np.arange(rows, dtype=np.uint64) * np.uint64(0x9E3779B97F4A7C15)) | np.uint64(1)
+    # Each pair is kept as one int64 key, min * n + max, so deduplicating is a 1-D unique
+    key_parts = [np.empty(0, dtype=np.int64)]
+    large_buckets = []
+    for band in range(bands):
+        band_values = signatures[valid, band * rows:(band + 1) * rows].astype(np.uint64)
+        keys = (band_values * multipliers).sum(axis=1)
+        order = valid[np.argsort(keys, kind="stable")]
+        sorted_keys = np.sort(keys, kind="stable")
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        sizes = np.diff(np.r_[starts, len(sorted_keys)])
+
+        # Buckets of the same size expand together, so there is one step per distinct size, not per bucket
+        for size in np.unique(sizes[sizes > 1]):
+            if size > MAX_BLOCK:
+                large_buckets.extend(order[start:start + size] for start in starts[sizes == size])
+                continue
+            i, j = _bucket_pairs(order, starts[sizes == size], size)
+            key_parts.append(np.minimum(i, j) * n + np.maximum(i, j))
+
+    # Sort and drop repeats rather than np.unique, which hashes integer arrays and is several times slower here
+    keys = np.concatenate(key_parts)
+    keys.sort()
+    keys = keys[np.r_[True, keys[1:] != keys[:-1]]] if len(keys) else keys
+    return np.column_stack((keys // n, keys % n)), large_buckets
+
+
+def _pair_similarities(vectors, pairs, chunk=500000):
+    """Cosine similarity of each ``(i, j)`` row pair of an L2-normalised sparse matrix."""
+    sims = np.empty(len(pairs))
+    for start in range(0, len(pairs), chunk):
+        block = pairs[start:start + chunk]
+        sims[start:start + chunk] = np.asarray(
+            vectors[block[:, 0]].multiply(vectors[block[:, 1]]).sum(axis=1)).ravel()
+    return sims
+
+
+def duplicate_clusters(titles, threshold=0.8):
+    """
+    Group titles whose TF-IDF cosine similarity exceeds ``threshold``.
+
+    Vectors stay sparse throughout. Small inputs use an exact sparse
+    self-join; larger ones only compare pairs that collide in a MinHash LSH
+    band, which keeps time and memory close to linear in the number of titles.
+
+    Returns:
+        List of clusters, each a sorted list of at least two title indices
+    """
+    n = len(titles)
+    if n < 2:
+        return []
+    try:
+        vectors = TfidfVectorizer().fit_transform(titles).tocsr()
+    except ValueError:
+        # Only stop words / empty titles: nothing to compare
+        return []
+
+    row_parts, col_parts = [], []
+    if n <= EXACT_LIMIT:
+        i, j = _similar_pairs(vectors, np.arange(n), threshold)
+        row_parts.append(i)
+        col_parts.append(j)
+    else:
+        pairs, large_buckets = candidate_pairs(minhash_signatures(vectors))
+        if len(pairs):
+            pairs = pairs[_pair_similarities(vectors, pairs) > threshold]
+            row_parts.append(pairs[:, 0])
+            col_parts.append(pairs[:, 1])
+        for bucket in large_buckets:
+            i, j = _similar_pairs(vectors, np.sort(bucket), threshold)
+            row_parts.append(i)
+            col_parts.append(j)
+
+    rows = np.concatenate(row_parts) if row_parts else np.empty(0, dtype=np.int64)
+    cols = np.concatenate(col_parts) if col_parts else np.empty(0, dtype=np.int64)
+    if not len(rows):
+        return []
+
+    graph = coo_matrix((np.ones(len(rows), dtype=np.int8), (rows, cols)), shape=(n, n))
+    _, labels = connected_components(graph, directed=False)
+    order = np.argsort(labels, kind="stable")
+    boundaries = np.flatnonzero(np.diff(labels[order])) + 1
+    return [group.tolist() for group in np.split(order, boundaries) if len(group) > 1]
+
+
+def find_duplicate_news(news_items, threshold=0.8):
+    """
+    Find duplicate news items based on title similarity.
+
+    Returns:
+        Dict mapping the first index of each cluster of similar titles to the
+        indices of the other items in that cluster
+    """
+    clusters = duplicate_clusters([news["title"] for news in news_items], threshold)
+    return {cluster[0]: cluster[1:] for cluster in clusters}
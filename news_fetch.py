@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""Concurrent download stage for the RSS feeds used by the news scraper."""
+import hashlib
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+import feedparser
+import requests
+from requests.adapters import HTTPAdapter
+
+from news_cache import DiskCache, cache_path
+from news_timing import NO_TIMINGS
+
+logger = logging.getLogger(__name__)
+
+# (connect, read) timeout applied to every feed request, in seconds
+FEED_TIMEOUT = (3.05, 10)
+# Wall-clock budget for downloading one feed; the read timeout alone lets a server that
+# trickles a few bytes at a time hold a worker for as long as it likes
+FEED_DEADLINE = 20
+DOWNLOAD_CHUNK = 64 * 1024
+MAX_FEED_WORKERS = 10
+USER_AGENT = "Mozilla/5.0 (compatible; AdvancedNewsScraper/1.0)"
+
+# feedparser is pure Python, so large documents are parsed in worker processes instead of
+# holding the GIL on the download threads; smaller ones parse faster than a round trip to a worker
+MAX_PARSE_WORKERS = os.cpu_count() or 1
+PARSE_IN_PROCESS_BYTES = 32 * 1024
+ENTRY_FIELDS = ("title", "link", "description", "published")
+
+_session = None
+_feed_cache = None
+_parse_pool = None
+_init_lock = threading.Lock()
+
+
+def get_session():
+    """Return the process-wide HTTP session with a keep-alive connection pool."""
+    global _session
+    if _session is None:
+        with _init_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=MAX_FEED_WORKERS, pool_maxsize=MAX_FEED_WORKERS)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers["User-Agent"] = USER_AGENT
+                _session = session
+    return _session
+
+
+def get_feed_cache():
+    """Return the on-disk feed cache (ETag/Last-Modified plus parsed entries, keyed by URL)."""
+    global _feed_cache
+    if _feed_cache is None:
+        with _init_lock:
+            if _feed_cache is None:
+                _feed_cache = DiskCache(cache_path("feeds.sqlite"))
+    return _feed_cache
+
+
+def normalize_entry(entry):
+    """Reduce a feedparser entry to the plain fields the app uses."""
+    published = entry.get("published_parsed") or entry.get("updated_parsed")
+    return {
+        "title": entry.get("title", ""),
+        "link": entry.get("link", ""),
+        "description": entry.get("description", ""),
+        "published": datetime(*published[:6]).isoformat() if published else None,
+    }
+
+
+def parse_feed_records(content):
+    """Parse a raw RSS/Atom document into compact ``ENTRY_FIELDS`` tuples, cheap to send between processes."""
+    feed = feedparser.parse(content)
+    return [tuple(normalize_entry(entry).values()) for entry in feed.entries if entry.get("title")]
+
+
+def parse_feed(content):
+    """Parse a raw RSS/Atom document into a list of normalized entries."""
+    return [dict(zip(ENTRY_FIELDS, record)) for record in parse_feed_records(content)]
+
+
+def get_parse_pool():
+    """Return the process-wide pool of feed parsing workers, starting it on first use."""
+    global _parse_pool
+    if _parse_pool is None:
+        with _init_lock:
+            if _parse_pool is None:
+                # spawn rather than fork: the app and the crawlers fork from processes with live threads
+                _parse_pool = ProcessPoolExecutor(max_workers=MAX_PARSE_WORKERS,
+                                                  mp_context=multiprocessing.get_context("spawn"))
+    return _parse_pool
+
+
+def shutdown_parse_pool():
+    """Stop the parse pool's workers, if it was started (a later parse starts a new pool)."""
+    global _parse_pool
+    with _init_lock:
+        pool, _parse_pool = _parse_pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+def parse_document(content, in_processes=True, timings=NO_TIMINGS):
+    """
+    Parse a downloaded feed into normalized entries.
+
+    Documents of at least PARSE_IN_PROCESS_BYTES go to the parse pool when
+    ``in_processes`` is set; if the pool has died they are parsed here instead.
+    """
+    global _parse_pool
+    if in_processes and len(content) >= PARSE_IN_PROCESS_BYTES:
+        pool = get_parse_pool()
+        try:
+            records = pool.submit(parse_feed_records, content).result()
+            timings.count("parse", "pooled")
+            return [dict(zip(ENTRY_FIELDS, record)) for record in records]
+        except BrokenProcessPool as e:
+            logger.warning(f"Feed parsing pool failed ({e}); parsing in this process")
+            with _init_lock:
+                if _parse_pool is pool:
+                    _parse_pool = None
+    return parse_feed(content)
+
+
+def response_socket(response):
+    """The socket a streamed response is read from, or None if it can't be found."""
+    sock = getattr(getattr(response.raw, "connection", None), "sock", None)
+    if sock is None:
+        # http.client detaches the socket from the connection when the server closes it after this
+        # response; the response's own reader still holds it
+        sock = getattr(getattr(getattr(getattr(response.raw, "_fp", None), "fp", None), "raw", None), "_sock", None)
+    return sock
+
+
+def read_body(response, deadline):
+    """
+    Read a streamed response's body, giving up when time.monotonic() passes ``deadline``.
+
+    A watchdog shuts the socket down at the deadline, which ends a read blocked on a
+    server that trickles bytes, however small the body. A body that finished
+    arriving in time is returned even if the watchdog fires while it is being joined.
+
+    Raises:
+        TimeoutError: the body was still incomplete at the deadline
+    """
+    lock = threading.Lock()
+    state = {"done": False, "expired": False}
+
+    def expire():
+        with lock:
+            if state["done"]:
+                return
+            state["expired"] = True
+        sock = response_socket(response)
+        try:
+            if sock is not None:
+                sock.shutdown(socket.SHUT_RDWR)
+            else:
+                response.close()
+        except OSError:
+            pass
+
+    watchdog = threading.Timer(max(0.0, deadline - time.monotonic()), expire)
+    watchdog.daemon = True
+    watchdog.start()
+    try:
+        content = b"".join(response.iter_content(DOWNLOAD_CHUNK))
+    except Exception:
+        if state["expired"]:
+            raise TimeoutError(f"{response.url} was not downloaded within its deadline") from None
+        raise
+    finally:
+        watchdog.cancel()
+    with lock:
+        state["done"] = True
+        # urllib3 checks Content-Length and chunk framing, so a normal end of a delimited body means it is whole;
+        # a body delimited by the connection closing may have been cut short by the watchdog
+        delimited = "Content-Length" in response.headers or "chunked" in response.headers.get("Transfer-Encoding", "")
+        if state["expired"] and not delimited:
+            raise TimeoutError(f"{response.url} was not downloaded within its deadline")
+    return content
+
+
+def fetch_feed(url, timeout=FEED_TIMEOUT, cache=None, timings=NO_TIMINGS, parse_in_processes=True,
+               deadline=FEED_DEADLINE):
+    """
+    Download and parse a single feed, using a conditional GET when cached.
+
+    Args:
+        url: Feed URL
+        timeout: requests timeout for each connect and read
+        cache: Optional DiskCache holding the validators and entries of earlier fetches
+        timings: Optional StageTimings receiving the download and parse times
+        parse_in_processes: Parse large documents in the parse pool (see parse_document)
+        deadline: Seconds the whole download may take before it is abandoned with a TimeoutError
+
+    Returns:
+        List of normalized entries
+    """
+    cached = cache.get(url) if cache is not None else None
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    with timings.stage("download"):
+        started = time.monotonic()
+        response = get_session().get(url, headers=headers, timeout=timeout, stream=True)
+        try:
+            if response.status_code == 304 and cached:
+                timings.count("download", "not_modified")
+                return cached["entries"]
+            response.raise_for_status()
+            content = read_body(response, started + deadline)
+        finally:
+            response.close()
+    timings.count("download", "bytes", len(content))
+
+    # Servers without validators still often return identical bodies, so skip the parse then too
+    digest = hashlib.sha1(content).hexdigest()
+    if cached and cached.get("digest") == digest:
+        timings.count("parse", "unchanged")
+        entries = cached["entries"]
+    else:
+        with timings.stage("parse"):
+            entries = parse_document(content, parse_in_processes, timings)
+
+    if cache is not None:
+        cache.set(url, {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "digest": digest,
+            "entries": entries,
+        })
+    return entries
+
+
+def iter_feeds(sources, timeout=FEED_TIMEOUT, max_workers=MAX_FEED_WORKERS, use_cache=True, timings=NO_TIMINGS,
+               parse_in_processes=True, deadline=FEED_DEADLINE):
+    """
+    Download and parse the RSS document of every source in parallel.
+
+    Yields ``(source, entries, error)`` tuples in completion order, so a slow
+    or dead feed only delays itself. Exactly one of ``entries``/``error`` is set.
+    Large documents are parsed in worker processes unless ``parse_in_processes`` is False.
+    Each download is abandoned after ``deadline`` seconds (see fetch_feed).
+    """
+    if not sources:
+        return
+    cache = get_feed_cache() if use_cache else None
+    workers = min(max_workers, len(sources))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(fetch_feed, source["rss"], timeout, cache, timings.for_source(source["name"]),
+                                   parse_in_processes, deadline): source
+                   for source in sources}
+        for future in as_completed(futures):
+            source = futures[future]
+            try:
+                yield source, future.result(), None
+            except Exception as e:
+                logger.warning(f"Error downloading {source['rss']}: {e}")
+                yield source, None, e
+
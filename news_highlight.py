@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""HTML highlighting of abusive keywords, AI-detected elements and search keywords in news titles."""
+from functools import lru_cache
+
+from keyword_matcher import KeywordMatcher, TokenMatcher, apply_spans, merge_spans
+from news_pipeline import find_abusive_spans
+
+HIGHLIGHT_COLORS = {"keyword": "red", "ai": "orange", "search": "green"}
+
+
+@lru_cache(maxsize=128)
+def get_search_matcher(keyword):
+    """Whole-word matcher for a search keyword, built once per keyword"""
+    return TokenMatcher([keyword])
+
+
+def highlight_abusive_words(text, languages=("en",), ai_detected_elements=None, keyword_spans=None,
+                            search_keyword=None):
+    """Highlight abusive keywords (red), AI-detected elements (orange) and the search keyword (green) in a single pass.
+
+    keyword_spans can pass the spans the pipeline already computed for this text.
+    """
+    if keyword_spans is None:
+        keyword_spans = find_abusive_spans(text, languages)
+    keyword_spans = [tuple(span[:3]) + ("keyword",) for span in keyword_spans]
+
+    ai_spans = []
+    if ai_detected_elements:
+        elements = [element for element in ai_detected_elements if element and len(element) > 2]
+        ai_spans = [span + ("ai",) for span in KeywordMatcher(elements, whole_words=False).find_spans(text)]
+
+    search_spans = []
+    if search_keyword:
+        search_spans = [span + ("search",) for span in get_search_matcher(search_keyword).find_spans(text)]
+
+    spans = merge_spans(keyword_spans, ai_spans, search_spans)
+    return apply_spans(text, spans, lambda matched, span:
+                       f'<span style="color:{HIGHLIGHT_COLORS[span[3]]};font-weight:bold">{matched}</span>')
+
+
+def highlight_search_keyword(text, keyword):
+    """Highlight search keyword in the text (whole words, across Devanagari and Kannada matras)"""
+    if not keyword:
+        return text
+    return apply_spans(text, get_search_matcher(keyword).find_spans(text), lambda matched, span:
+                       f'<span style="color:{HIGHLIGHT_COLORS["search"]};font-weight:bold">{matched}</span>')
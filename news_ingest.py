@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Background news ingestion daemon.
+
+Polls every RSS source (and today's Sarkari Pariksha pages) on a schedule and
+writes normalized items, abuse verdicts and hashes to the local news store,
+so the Streamlit app can serve page loads from local queries.
+
+Usage:
+    python news_ingest.py                     # poll every 15 minutes
+    python news_ingest.py --once --ai         # single pass with Gemini abuse analysis
+    python news_ingest.py --sarkari-from 2025-03-01 --sarkari-to 2025-03-31
+                                              # backfill a month of Sarkari Pariksha pages and exit
+"""
+import argparse
+import logging
+import os
+import time
+from datetime import date, datetime
+
+from dotenv import load_dotenv
+
+from news_pipeline import (
+    NEWS_SOURCES, fetch_rss_news, scrape_sarkari_pariksha, iter_sarkari_news, apply_ai_abuse_analysis,
+)
+from news_seen import get_seen_filter
+from news_store import NewsStore, STORE_PATH
+
+logger = logging.getLogger(__name__)
+
+LANGUAGES = sorted({source["language"] for source in NEWS_SOURCES})
+SARKARI_LANGUAGES = ("en", "hi")
+
+
+def configure_gemini():
+    """Configure Gemini from GEMINI_API_KEY, returning False when AI analysis is unavailable."""
+    load_dotenv()
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        logger.warning("GEMINI_API_KEY not set; AI abuse analysis disabled")
+        return False
+    import google.generativeai as genai
+    genai.configure(api_key=api_key)
+    return True
+
+
+def ingest_once(store, languages=LANGUAGES, days_back=1, use_ai_analysis=False, include_sarkari=True,
+                seen_filter=None):
+    """
+    Run one ingestion pass over every language and return the number of items written.
+
+    Items in ``seen_filter`` (a SeenFilter) were stored by an earlier pass and are
+    skipped before any analysis; the ones written by this pass are added to it.
+    The pass is recorded in the store, which tells the app that ingestion is running.
+    """
+    written = 0
+    today = datetime.now()
+    for language in languages:
+        start = time.time()
+        news_items = fetch_rss_news(language, days_back, use_ai_analysis=use_ai_analysis, skip_seen=seen_filter)
+
+        if include_sarkari and language in SARKARI_LANGUAGES:
+            try:
+                sarkari_news = scrape_sarkari_pariksha(
+                    language, str(today.year), today.strftime("%B").lower(), today.day)
+                if seen_filter is not None:
+                    seen_before = seen_filter.seen_many(news["hash"] for news in sarkari_news)
+                    sarkari_news = [news for news in sarkari_news if news["hash"] not in seen_before]
+                if use_ai_analysis:
+                    apply_ai_abuse_analysis(sarkari_news)
+                news_items += sarkari_news
+            except Exception as e:
+                logger.warning(f"Error fetching from Sarkari Pariksha: {e}")
+
+        count = store.add_news(news_items, language)
+        if seen_filter is not None:
+            seen_filter.add_many(news["hash"] for news in news_items)
+        written += count
+        logger.info(f"{language}: stored {count} new items in {time.time() - start:.1f}s")
+    store.record_ingest()
+    return written
+
+
+def backfill_sarkari(store, start, end, languages=SARKARI_LANGUAGES, use_ai_analysis=False):
+    """Crawl every Sarkari Pariksha page between two dates concurrently and store the items."""
+    written = 0
+    started = time.time()
+    for language, day, sarkari_news in iter_sarkari_news(languages, start, end):
+        if use_ai_analysis:
+            apply_ai_abuse_analysis(sarkari_news)
+        written += store.add_news(sarkari_news, language)
+        logger.info(f"Sarkari Pariksha {language} {day}: stored {len(sarkari_news)} items")
+    logger.info(f"Backfill finished: {written} items from {start} to {end} in {time.time() - started:.1f}s")
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest news into the local store on a schedule")
+    parser.add_argument("--interval", type=int, default=900, help="Seconds between passes (default: 900)")
+    parser.add_argument("--once", action="store_true", help="Run a single pass and exit")
+    parser.add_argument("--languages", nargs="+", default=LANGUAGES, choices=LANGUAGES)
+    parser.add_argument("--days-back", type=int, default=1, help="Only keep items published this many days back")
+    parser.add_argument("--ai", action="store_true", help="Classify items with Gemini batch abuse analysis")
+    parser.add_argument("--no-sarkari", action="store_true", help="Skip the Sarkari Pariksha pages")
+    parser.add_argument("--reprocess", action="store_true",
+                        help="Forget which items earlier passes stored and analyze every item again")
+    parser.add_argument("--db", default=STORE_PATH, help="Path of the SQLite news store")
+    parser.add_argument("--sarkari-from", type=date.fromisoformat, metavar="YYYY-MM-DD",
+                        help="Backfill Sarkari Pariksha pages from this date, then exit")
+    parser.add_argument("--sarkari-to", type=date.fromisoformat, metavar="YYYY-MM-DD",
+                        help="Last date of the backfill (default: today)")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+    )
+    use_ai_analysis = args.ai and configure_gemini()
+    store = NewsStore(args.db)
+    if args.sarkari_from:
+        try:
+            languages = [language for language in args.languages if language in SARKARI_LANGUAGES]
+            backfill_sarkari(store, args.sarkari_from, args.sarkari_to or date.today(), languages, use_ai_analysis)
+        finally:
+            store.close()
+        return
+    seen_filter = get_seen_filter("ingest")
+    if args.reprocess:
+        seen_filter.clear()
+    try:
+        while True:
+            started = time.time()
+            try:
+                written = ingest_once(store, args.languages, args.days_back, use_ai_analysis, not args.no_sarkari,
+                                      seen_filter)
+                logger.info(f"Pass finished: {written} items written, {store.count()} in store")
+            except Exception as e:
+                logger.error(f"Ingestion pass failed: {e}")
+            if args.once:
+                break
+            time.sleep(max(0, args.interval - (time.time() - started)))
+    except KeyboardInterrupt:
+        logger.info("Stopping ingestion")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
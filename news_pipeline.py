@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+"""
+Headless news ingestion pipeline: sources, keyword abuse detection, RSS and
+Sarkari Pariksha fetching. Shared by the Streamlit app and the background tools.
+"""
+import bisect
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from keyword_matcher import TokenMatcher
+from news_fetch import iter_feeds
+from news_timing import NO_TIMINGS
+from sarkari_crawler import fetch_sarkari_page, iter_sarkari_pages
+
+logger = logging.getLogger(__name__)
+
+# Define abusive keywords to detect
+# Define abusive keywords to detect in multiple languages
+ABUSIVE_KEYWORDS = {
+    "en": [
+        "kill", "murder", "assault", "attack", "hate", "violent", "terror",
+        "bomb", "shoot", "racist", "abuse", "threat", "harass", "genocide",
+        "extremist", "rape", "torture", "massacre", "suicide", "riot",
+        "hostage", "kidnap", "lynch", "brutal", "bloodshed", "slaughter",
+        "militant", "radicalize", "jihad", "supremacist"
+    ],
+    
+    "hi": [
+        # Violence related
+        "हत्या", "मारना", "हमला", "हिंसा", "आतंक", "बम", "गोली", 
+        # Hate speech related
+        "नफरत", "नस्लवादी", "दुर्व्यवहार", "धमकी", "परेशान", 
+        # More violent terms
+        "बलात्कार", "यातना", "नरसंहार", "आत्महत्या", "दंगा",
+        # Threats and abuse
+        "बंधक", "अपहरण", "लिंचिंग", "क्रूर", "खून", "क़त्ल",
+        # Extremism related
+        "आतंकवादी", "चरमपंथी", "जिहाद", "हिंसक", "उग्रवादी"
+    ],
+    
+    "kn": [
+        # Violence related
+        "ಕೊಲೆ", "ಹತ್ಯೆ", "ದಾಳಿ", "ಹಿಂಸೆ", "ಭಯೋತ್ಪಾದನೆ", "ಬಾಂಬ್", "ಗುಂಡು",
+        # Hate speech related
+        "ದ್ವೇಷ", "ತಾರತಮ್ಯ", "ದುರುಪಯೋಗ", "ಬೆದರಿಕೆ", "ಕಿರುಕುಳ",
+        # More violent terms
+        "ಅತ್ಯಾಚಾರ", "ಚಿತ್ರಹಿಂಸೆ", "ಸಾಮೂಹಿಕ ಹತ್ಯೆ", "ಆತ್ಮಹತ್ಯೆ", "ಗಲಭೆ",
+        # Threats and abuse
+        "ಒತ್ತೆ", "ಅಪಹರಣ", "ಲಿಂಚಿಂಗ್", "ಕ್ರೂರ", "ರಕ್ತಪಾತ", "ಕೊಲೆ",
+        # Extremism related
+        "ಉಗ್ರಗಾಮಿ", "ತೀವ್ರವಾದಿ", "ಜಿಹಾದ್", "ಹಿಂಸಾತ್ಮಕ", "ಭಯೋತ್ಪಾದಕ"
+    ]
+}
+
+# Characters of an article body sent along with the title for AI abuse analysis
+AI_BODY_CHARS = 1500
+
+# Define news sources
+NEWS_SOURCES = [
+    {"name": "CNN", "rss": "http://rss.cnn.com/rss/cnn_topstories.rss", "language": "en"},
+    {"name": "BBC", "rss": "http://feeds.bbci.co.uk/news/rss.xml", "language": "en"},
+    {"name": "Reuters", "rss": "http://feeds.reuters.com/reuters/topNews", "language": "en"},
+    {"name": "NPR", "rss": "https://feeds.npr.org/1001/rss.xml", "language": "en"},
+    {"name": "The Guardian", "rss": "https://www.theguardian.com/world/rss", "language": "en"},
+    # Hindi sources
+    {"name": "Jagran", "rss": "https://www.jagran.com/rss/news-national.xml", "language": "hi"},
+    {"name": "Dainik Bhaskar", "rss": "https://www.bhaskar.com/rss-v1--category-1740.xml", "language": "hi"},
+    # Kannada sources
+    {"name": "Vijaya Karnataka", "rss": "https://vijaykarnataka.com/rss", "language": "kn"},
+    {"name": "Prajavani", "rss": "https://www.prajavani.net/feed", "language": "kn"},
+    {"name": "Udayavani", "rss": "https://www.udayavani.com/feed", "language": "kn"},
+]
+
+
+@lru_cache(maxsize=None)
+def get_abuse_matcher(languages=("en",)):
+    """Build (once per process and language set) the token table for ABUSIVE_KEYWORDS"""
+    keywords = []
+    for lang in languages:
+        keywords += ABUSIVE_KEYWORDS.get(lang, [])
+    return TokenMatcher(keywords)
+
+def find_abusive_spans(text, languages=("en",)):
+    """Return (start, end, keyword) spans of every abusive keyword in the text"""
+    if isinstance(languages, str):
+        languages = (languages,)
+    return get_abuse_matcher(tuple(sorted(languages))).find_spans(text)
+
+def has_abusive_keywords(text, languages=("en",)):
+    """Check whether the text contains any abusive keyword for the given languages"""
+    if isinstance(languages, str):
+        languages = (languages,)
+    return get_abuse_matcher(tuple(sorted(languages))).search(text)
+
+
+def get_news_hash(title):
+    """Generate a hash for a news title to identify duplicates"""
+    return hashlib.md5(title.lower().encode()).hexdigest()
+
+def news_sort_key(news):
+    """Sort key placing the newest items first (undated items last)"""
+    return -((news.get("pub_date") or datetime.min) - datetime.min).total_seconds()
+
+def merge_news(unique_news, seen_hashes, news_items):
+    """Add the unseen items to the date-sorted unique_news list in place, returning the ones added"""
+    added = []
+    for news in news_items:
+        if news["hash"] not in seen_hashes:
+            seen_hashes.add(news["hash"])
+            bisect.insort(unique_news, news, key=news_sort_key)
+            added.append(news)
+    return added
+
+def iter_rss_news(language="en", days_back=1, search_keyword=None, use_ai_analysis=False, seen_hashes=None,
+                  on_error=logger.warning, timings=NO_TIMINGS, fetch_bodies=False, skip_seen=None,
+                  parse_in_processes=True):
+    """Yield (source_name, news_items) as each RSS feed of the selected language becomes ready.
+
+    Items are checked for abusive content before they are yielded, and items
+    whose hash is already in seen_hashes (updated as we go) are dropped.
+    With fetch_bodies, each item's full article text is downloaded into "body"
+    (see add_article_bodies) before the abuse checks that use it.
+    Items whose hash is in skip_seen (a news_seen.SeenFilter of items processed
+    in earlier runs) are dropped before any analysis.
+    Per-source problems are reported through on_error (e.g. st.warning in the app),
+    and per-source stage times and counters through timings (a StageTimings).
+    parse_in_processes=False parses every feed on its download thread (see news_fetch.iter_feeds).
+    """
+    if seen_hashes is None:
+        seen_hashes = set()
+    
+    # Calculate the date threshold for recent news
+    date_threshold = datetime.now() - timedelta(days=days_back)
+    
+    # Download every selected feed concurrently (served from the feed cache when unchanged)
+    sources = [source for source in NEWS_SOURCES if source["language"] == language]
+    for source, entries, error in iter_feeds(sources, timings=timings, parse_in_processes=parse_in_processes):
+        source_timings = timings.for_source(source["name"])
+        if error is not None:
+            source_timings.count("download", "errors")
+            on_error(f"Error fetching from {source['name']}: {str(error)}")
+            continue
+        source_news = []
+        source_timings.count("filter", "entries", len(entries))
+        try:
+            for entry in entries[:20]:  # Increased limit to get more recent news
+                title = entry["title"]
+                link = entry["link"]
+                description = entry["description"]
+                
+                # Parse the published date
+                pub_date = datetime.fromisoformat(entry["published"]) if entry["published"] else None
+                
+                # Skip if not recent enough and we have a date
+                if pub_date and pub_date < date_threshold:
+                    source_timings.count("filter", "too_old")
+                    continue
+                
+                # Skip if search keyword is provided and not in title or description
+                if search_keyword and search_keyword.lower() not in title.lower() and search_keyword.lower() not in description.lower():
+                    source_timings.count("filter", "no_keyword_match")
+                    continue
+                
+                # Create a unique hash for this news item, skipping ones we already have
+                news_hash = get_news_hash(title)
+                if news_hash in seen_hashes:
+                    source_timings.count("filter", "duplicates")
+                    continue
+                seen_hashes.add(news_hash)
+                if skip_seen is not None and news_hash in skip_seen:
+                    source_timings.count("filter", "seen_before")
+                    continue
+                
+                # Check for abusive content using predefined keywords, keeping the title spans for highlighting
+                with source_timings.stage("keywords"):
+                    keyword_spans = find_abusive_spans(title, source["language"])
+                    has_keyword_abuse = bool(keyword_spans) or has_abusive_keywords(description, source["language"])
+                
+                source_news.append({
+                    "title": title,
+                    "link": link,
+                    "description": description,
+                    "source": source["name"],
+                    "hash": news_hash,
+                    "has_abusive": has_keyword_abuse,
+                    "abusive_elements": [],
+                    "keyword_spans": keyword_spans,
+                    "pub_date": pub_date
+                })
+        except Exception as e:
+            on_error(f"Error fetching from {source['name']}: {str(e)}")
+        
+        source_timings.count("filter", "kept", len(source_news))
+        
+        if fetch_bodies:
+            with source_timings.stage("articles"):
+                add_article_bodies(source_news, source["language"], on_error, source_timings)
+        
+        # Check for abusive content using AI (if enabled), batching every item keyword detection didn't flag
+        if use_ai_analysis:
+            with source_timings.stage("ai_analysis"):
+                apply_ai_abuse_analysis(source_news, on_error)
+        
+        yield source["name"], source_news
+
+def fetch_rss_news(language="en", days_back=1, search_keyword=None, use_ai_analysis=False, on_error=logger.warning,
+                   timings=NO_TIMINGS, fetch_bodies=False, skip_seen=None, parse_in_processes=True):
+    """Fetch news from RSS feeds based on selected language"""
+    unique_news = []
+    for _, source_news in iter_rss_news(language, days_back, search_keyword, use_ai_analysis, on_error=on_error,
+                                        timings=timings, fetch_bodies=fetch_bodies, skip_seen=skip_seen,
+                                        parse_in_processes=parse_in_processes):
+        unique_news.extend(source_news)
+    
+    # Sort by publication date (newest first)
+    with timings.stage("sort"):
+        unique_news.sort(key=news_sort_key)
+    
+    return unique_news
+
+def build_sarkari_news(entries, language, pub_date, search_keyword=None, seen_hashes=None):
+    """Turn ``(title, link)`` pairs from a Sarkari Pariksha page into news items, with keyword-based abuse detection"""
+    sarkari_news = []
+    for news_title, href_link in entries:
+        # Skip if search keyword is provided and not in title
+        if search_keyword and search_keyword.lower() not in news_title.lower():
+            continue
+        
+        news_hash = get_news_hash(news_title)
+        if seen_hashes is not None:
+            if news_hash in seen_hashes:
+                continue
+            seen_hashes.add(news_hash)
+        
+        # Check for abusive content using predefined keywords, keeping the spans for highlighting
+        keyword_spans = find_abusive_spans(news_title, language)
+        
+        sarkari_news.append({
+            "title": news_title,
+            "link": href_link,
+            "description": "",
+            "source": "Sarkari Pariksha",
+            "hash": news_hash,
+            "has_abusive": bool(keyword_spans),
+            "abusive_elements": [],
+            "keyword_spans": keyword_spans,
+            "pub_date": pub_date
+        })
+    return sarkari_news
+
+def scrape_sarkari_pariksha(language, year, month, day, search_keyword=None):
+    """Scrape one day of Sarkari Pariksha current affairs (en/hi), with keyword-based abuse detection"""
+    entries = fetch_sarkari_page(language, year, month, day)
+    # Assume current date as publication date
+    return build_sarkari_news(entries, language, datetime.now(), search_keyword)
+
+def iter_sarkari_news(languages, start, end, search_keyword=None, seen_hashes=None, on_error=logger.warning):
+    """Yield (language, day, news_items) for every Sarkari Pariksha page between two dates as it is fetched.
+
+    Pages are downloaded concurrently over the shared session; items are dated
+    with the day of their page, and hashes already in seen_hashes are dropped.
+    """
+    if seen_hashes is None:
+        seen_hashes = set()
+    for language, day, entries, error in iter_sarkari_pages(languages, start, end):
+        if error is not None:
+            on_error(f"Error fetching from Sarkari Pariksha ({language}, {day}): {str(error)}")
+            continue
+        pub_date = datetime(day.year, day.month, day.day)
+        yield language, day, build_sarkari_news(entries, language, pub_date, search_keyword, seen_hashes)
+
+def add_article_bodies(news_items, language="en", on_error=logger.warning, timings=NO_TIMINGS):
+    """Download the full article text of every item into news["body"] and check it for abusive keywords.
+
+    Pages that cannot be fetched get an empty body; see news_articles for the
+    concurrency limits and the on-disk cache.
+    """
+    from news_articles import fetch_article_bodies
+    bodies = fetch_article_bodies([news["link"] for news in news_items], on_error=on_error, timings=timings)
+    for news in news_items:
+        news["body"] = bodies.get(news["link"], "")
+        if news["body"] and not news["has_abusive"]:
+            news["has_abusive"] = has_abusive_keywords(news["body"], language)
+    return news_items
+
+def apply_ai_abuse_analysis(news_items, on_error=logger.warning):
+    """Classify the items keyword detection didn't flag with batched Gemini requests, updating them in place.
+
+    Gemini must already be configured (genai.configure) by the caller.
+    """
+    from abuse_classifier import classify_abuse_batch
+    pending = {}
+    for news in news_items:
+        if not news["has_abusive"]:
+            # Combine title and description (or the start of the article) for analysis;
+            # article verdicts are cached apart from the ones made on the description alone
+            if news.get("body"):
+                pending[f"{news['hash']}:body"] = f"{news['title']}. {news['body'][:AI_BODY_CHARS]}"
+            else:
+                pending[news["hash"]] = f"{news['title']}. {news['description']}" if news.get("description") else news["title"]
+    if not pending:
+        return news_items
+    
+    verdicts = classify_abuse_batch(pending, on_error=on_error)
+    for news in news_items:
+        item_id = f"{news['hash']}:body" if news.get("body") else news["hash"]
+        if item_id in verdicts:
+            ai_abuse_detected, ai_abuse_elements = verdicts[item_id]
+            news["has_abusive"] = ai_abuse_detected
+            news["abusive_elements"] = ai_abuse_elements
+    return news_items
+
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""Local interest-based news recommendations using TF-IDF vectors and cosine similarity."""
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from keyword_matcher import normalize_token, token_pattern
+
+# Words describing each interest. Items are ranked by how close their text is to these profiles,
+# so the Hindi and Kannada terms let the same interests work for every language.
+INTEREST_PROFILES = {
+    "Politics": "politics election government minister parliament party vote policy president congress bjp "
+                "senate campaign opposition chief minister cabinet "
+                "राजनीति चुनाव सरकार मंत्री संसद पार्टी वोट नीति "
+                "ರಾಜಕೀಯ ಚುನಾವಣೆ ಸರ್ಕಾರ ಸಚಿವ ಪಕ್ಷ ಮತ",
+    "Technology": "technology tech software ai artificial intelligence internet app digital startup computer "
+                  "smartphone cyber data chip google apple microsoft "
+                  "तकनीक प्रौद्योगिकी सॉफ्टवेयर इंटरनेट डिजिटल "
+                  "ತಂತ್ರಜ್ಞಾನ ಸಾಫ್ಟ್‌ವೇರ್ ಇಂಟರ್ನೆಟ್ ಡಿಜಿಟಲ್",
+    "Business": "business economy market stock shares company trade finance bank investment inflation gdp "
+                "revenue profit rupee sensex nifty "
+                "व्यापार अर्थव्यवस्था बाजार शेयर कंपनी बैंक निवेश "
+                "ವ್ಯಾಪಾರ ಆರ್ಥಿಕತೆ ಮಾರುಕಟ್ಟೆ ಷೇರು ಕಂಪನಿ ಬ್ಯಾಂಕ್",
+    "Health": "health hospital doctor disease medical vaccine covid virus patients medicine cancer outbreak "
+              "स्वास्थ्य अस्पताल डॉक्टर बीमारी दवा टीका "
+              "ಆರೋಗ್ಯ ಆಸ್ಪತ್ರೆ ವೈದ್ಯ ರೋಗ ಲಸಿಕೆ",
+    "Sports": "sports cricket football match tournament team player cup olympics tennis score win league "
+              "खेल क्रिकेट फुटबॉल मैच टीम खिलाड़ी "
+              "ಕ್ರೀಡೆ ಕ್ರಿಕೆಟ್ ಫುಟ್ಬಾಲ್ ಪಂದ್ಯ ತಂಡ ಆಟಗಾರ",
+    "Entertainment": "entertainment film movie actor actress music celebrity bollywood hollywood show box office "
+                     "मनोरंजन फिल्म अभिनेता अभिनेत्री संगीत "
+                     "ಮನರಂಜನೆ ಚಲನಚಿತ್ರ ನಟ ನಟಿ ಸಂಗೀತ ಸಿನಿಮಾ",
+    "Science": "science research scientists space nasa isro study discovery physics biology satellite "
+               "विज्ञान अनुसंधान वैज्ञानिक अंतरिक्ष इसरो "
+               "ವಿಜ್ಞಾನ ಸಂಶೋಧನೆ ವಿಜ್ಞಾನಿ ಬಾಹ್ಯಾಕಾಶ ಇಸ್ರೋ",
+    "Environment": "environment climate pollution weather flood rain heatwave forest wildlife emissions energy "
+                   "पर्यावरण जलवायु प्रदूषण मौसम बाढ़ बारिश "
+                   "ಪರಿಸರ ಹವಾಮಾನ ಮಾಲಿನ್ಯ ಪ್ರವಾಹ ಮಳೆ",
+}
+
+# Tokens are cut to this many characters, a crude stemmer that lets
+# "elections" match "election" and "चुनावों" match "चुनाव"
+STEM_LENGTH = 5
+
+
+def stem_tokens(text):
+    """Normalized word tokens (as keyword matching sees them) truncated to STEM_LENGTH characters."""
+    return [normalize_token(word)[:STEM_LENGTH] for word in token_pattern().findall(text)]
+
+
+def news_text(news):
+    """Text of a news item used for matching."""
+    return f"{news['title']} {news.get('description') or ''}"
+
+
+def rank_by_interests(news_items, interests, top_k=10):
+    """
+    Rank news items by similarity to the selected interests.
+
+    Items and interest profiles share one TF-IDF space over stemmed words
+    (see stem_tokens), so inflected forms still match the profile words. An
+    item's score is its best cosine similarity to any selected interest.
+
+    Args:
+        news_items: Items in the app's schema
+        interests: Interest names from INTEREST_PROFILES (or free-text interests)
+        top_k: Number of items to return
+
+    Returns:
+        List of ``(index, score)`` pairs, best first, with zero scores left out
+    """
+    if not news_items or not interests:
+        return []
+    profiles = [INTEREST_PROFILES.get(interest, interest) for interest in interests]
+    vectorizer = TfidfVectorizer(analyzer=stem_tokens, sublinear_tf=True)
+    try:
+        vectors = vectorizer.fit_transform([news_text(news) for news in news_items] + profiles)
+    except ValueError:
+        # No usable text at all
+        return []
+
+    item_vectors, profile_vectors = vectors[:len(news_items)], vectors[len(news_items):]
+    # Rows are L2-normalised, so the sparse product is the cosine similarity
+    scores = (item_vectors @ profile_vectors.T).max(axis=1).toarray().ravel()
+    top_k = min(top_k, len(scores))
+    best = np.argpartition(-scores, top_k - 1)[:top_k]
+    best = best[np.argsort(-scores[best], kind="stable")]
+    return [(int(index), float(scores[index])) for index in best if scores[index] > 0]
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent record of the news hashes already processed, with time-based expiry.
+
+Lets ingestion skip keyword and AI analysis for items it handled in an earlier
+pass, and lets the app tell which stories are new since the last fetch. Only a
+60-bit integer prefix of each ``get_news_hash`` digest is kept, so a million
+items take a few tens of MB; the chance of two titles sharing a prefix is
+negligible at that size.
+"""
+import sqlite3
+import threading
+import time
+
+from news_cache import cache_path
+
+# Items older than this are forgotten, so they count as new again if they come back
+SEEN_TTL = 14 * 24 * 3600
+
+_filters = {}
+_filters_lock = threading.Lock()
+
+
+def hash_key(news_hash):
+    """Integer key of an md5 hex digest: its first 60 bits, which fit a signed SQLite INTEGER."""
+    return int(news_hash[:15], 16)
+
+
+class SeenFilter:
+    """Set of news hashes stored in SQLite, each entry expiring ``ttl`` seconds after it was last seen."""
+
+    def __init__(self, path, ttl=SEEN_TTL):
+        """
+        Open (or create) a filter database.
+
+        Args:
+            path: Location of the SQLite file
+            ttl: Seconds after which a hash is forgotten (None keeps hashes forever)
+        """
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS seen (key INTEGER PRIMARY KEY, seen REAL NOT NULL)")
+        self._conn.commit()
+
+    def _threshold(self):
+        return time.time() - self.ttl if self.ttl is not None else float("-inf")
+
+    def seen_many(self, news_hashes):
+        """Return the subset of ``news_hashes`` seen within the TTL."""
+        keys = {}
+        for news_hash in news_hashes:
+            keys.setdefault(hash_key(news_hash), []).append(news_hash)
+        if not keys:
+            return set()
+        threshold = self._threshold()
+        found = set()
+        key_list = list(keys)
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for i in range(0, len(key_list), 500):
+                chunk = key_list[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT key FROM seen WHERE seen >= ? AND key IN ({','.join('?' * len(chunk))})",
+                    [threshold] + chunk,
+                ).fetchall()
+                for (key,) in rows:
+                    found.update(keys[key])
+        return found
+
+    def __contains__(self, news_hash):
+        return bool(self.seen_many([news_hash]))
+
+    def add_many(self, news_hashes):
+        """Mark every hash as seen now, in one transaction, and drop the expired ones."""
+        now = time.time()
+        rows = [(hash_key(news_hash), now) for news_hash in set(news_hashes)]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO seen (key, seen) VALUES (?, ?)", rows)
+            if self.ttl is not None:
+                self._conn.execute("DELETE FROM seen WHERE seen < ?", (now - self.ttl,))
+            self._conn.commit()
+
+    def add(self, news_hash):
+        self.add_many([news_hash])
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM seen")
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM seen WHERE seen >= ?", (self._threshold(),)).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def get_seen_filter(name):
+    """
+    Return the process-wide filter called ``name``, opening it on first use.
+
+    Each consumer keeps its own filter ("ingest" for the daemon, "app" for the
+    Streamlit app), so one marking items as processed doesn't hide them from the other.
+    """
+    seen_filter = _filters.get(name)
+    if seen_filter is None:
+        with _filters_lock:
+            seen_filter = _filters.get(name)
+            if seen_filter is None:
+                seen_filter = _filters[name] = SeenFilter(cache_path(f"seen_{name}.sqlite"))
+    return seen_filter
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Local lexicon-based sentiment scoring of news items in English, Hindi and Kannada.
+
+Each item's title and description are reduced to the lexicon words they
+contain, one sparse count matrix is built for the whole set, and scores and
+per-source and per-day distributions come from sparse products and bincounts.
+The three scripts never share a token, so one combined lexicon serves every
+language. Negation and sarcasm are not modelled; the scores describe the
+overall tone of the coverage, not individual stories.
+"""
+from functools import lru_cache
+
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer
+
+from keyword_matcher import normalize_token, token_pattern
+from news_pipeline import ABUSIVE_KEYWORDS
+from news_recommender import news_text
+
+# Word weights per language. Entries ending in "*" match any word starting with them,
+# for Kannada's suffixed forms ("ಅಪಘಾತ*" matches "ಅಪಘಾತದಲ್ಲಿ").
+SENTIMENT_LEXICON = {
+    "en": {
+        1: "win wins won winning victory success successful growth gain gains rise rises boost boosts improve "
+           "improves improved improvement recovery recovers hope hopeful celebrate celebrates celebration award "
+           "awarded peace breakthrough praise praised benefit benefits relief rescue rescued safe safely strong "
+           "surge surges soar soars best happy help helps support welcome welcomes approve approved approval "
+           "progress achieve achieved achievement cure innovation profit profits upgrade historic boom thrive",
+        -1: "loss losses lose loses lost fall falls fell drop drops decline declines crash crashes crisis fear "
+            "fears death deaths dead die dies died killed injured injury injuries accident disaster flood floods "
+            "drought fire blaze war conflict protest protests strike arrest arrested fraud scam corruption "
+            "scandal ban banned fail fails failed failure warn warns warning risk shortage recession layoffs "
+            "collapse collapsed victim victims tension clash clashes outbreak disease pollution poverty "
+            "unemployment slump plunge plunges worst sad anger angry condemn condemns accused allegation "
+            "allegations jailed sentenced lawsuit sued delay delayed cancelled canceled chaos panic",
+    },
+    "hi": {
+        1: "जीत सफलता सफल विकास वृद्धि बढ़त लाभ मुनाफा राहत खुशी उम्मीद आशा सम्मान पुरस्कार शांति समझौता "
+           "सुधार प्रगति उपलब्धि मदद सहायता बचाव स्वागत मजबूत रिकॉर्ड जश्न तरक्की कामयाबी ऐतिहासिक बेहतर",
+        -1: "हार नुकसान घाटा गिरावट मौत मौतें मृत्यु मृतक घायल हादसा हादसे दुर्घटना आपदा बाढ़ सूखा आग युद्ध "
+            "संघर्ष विरोध हड़ताल गिरफ्तार गिरफ्तारी धोखाधड़ी घोटाला भ्रष्टाचार प्रतिबंध विफल असफल चेतावनी खतरा "
+            "संकट कमी मंदी महंगाई छंटनी तनाव झड़प बीमारी प्रदूषण गरीबी बेरोजगारी आरोप नाराज गुस्सा दुख शोक",
+    },
+    "kn": {
+        1: "ಗೆಲುವು ಗೆಲುವಿನ ಯಶಸ್ಸು ಯಶಸ್ವಿ* ಅಭಿವೃದ್ಧಿ* ಬೆಳವಣಿಗೆ* ಲಾಭ* ಪರಿಹಾರ* ಸಂತಸ* ಸಂತೋಷ* ಭರವಸೆ* "
+           "ಸನ್ಮಾನ* ಪ್ರಶಸ್ತಿ* ಶಾಂತಿ* ಒಪ್ಪಂದ* ಸುಧಾರಣೆ* ಪ್ರಗತಿ* ಸಾಧನೆ* ನೆರವು ನೆರವಿನ ಸಹಾಯ* ಸ್ವಾಗತ* ದಾಖಲೆ* "
+           "ಸಂಭ್ರಮ* ಉತ್ತಮ*",
+        -1: "ಸೋಲು ಸೋಲಿನ ನಷ್ಟ* ಕುಸಿತ* ಸಾವು ಸಾವಿನ ಮರಣ* ಗಾಯಗೊಂಡ* ಗಾಯಾಳು* ಅಪಘಾತ* ದುರಂತ* ವಿಪತ್ತು* ಪ್ರವಾಹ* "
+            "ಬೆಂಕಿ* ಯುದ್ಧ* ಸಂಘರ್ಷ* ಪ್ರತಿಭಟನೆ* ಮುಷ್ಕರ* ಬಂಧನ* ವಂಚನೆ* ಹಗರಣ* ಭ್ರಷ್ಟಾಚಾರ* ನಿಷೇಧ* ವಿಫಲ* "
+            "ಎಚ್ಚರಿಕೆ* ಅಪಾಯ* ಬಿಕ್ಕಟ್ಟು* ಕೊರತೆ* ಆತಂಕ* ಉದ್ವಿಗ್ನ* ಘರ್ಷಣೆ* ರೋಗ* ಮಾಲಿನ್ಯ* ಬಡತನ* ನಿರುದ್ಯೋಗ* "
+            "ಆರೋಪ* ಆಕ್ರೋಶ* ದುಃಖ*",
+    },
+}
+# Abusive keywords (violence, hate, extremism) weigh double
+ABUSIVE_WEIGHT = -2
+# Mean word weight beyond which an item counts as positive or negative
+LABEL_THRESHOLD = 0.1
+LABELS = ("negative", "neutral", "positive")
+
+
+@lru_cache(maxsize=None)
+def get_lexicon():
+    """
+    Build the combined lexicon once.
+
+    Returns:
+        ``(entries, weights, exact, prefixes)``: the entry list matching the
+        columns of the count matrix, their weights, a dict of exact words to
+        entries and a dict of prefixes to entries
+    """
+    weighted = {}
+    for language, polarities in SENTIMENT_LEXICON.items():
+        for weight, words in polarities.items():
+            for word in words.split():
+                weighted[word] = weight
+        for keyword in ABUSIVE_KEYWORDS.get(language, []):
+            if " " not in keyword:
+                weighted[keyword] = ABUSIVE_WEIGHT
+    entries = sorted(weighted)
+    exact, prefixes = {}, {}
+    for entry in entries:
+        if entry.endswith("*"):
+            prefixes[normalize_token(entry[:-1])] = entry
+        else:
+            exact[normalize_token(entry)] = entry
+    return entries, np.array([weighted[entry] for entry in entries], dtype=float), exact, prefixes
+
+
+@lru_cache(maxsize=65536)
+def lexicon_entry(word):
+    """The lexicon entry a word belongs to, or None."""
+    _, _, exact, prefixes = get_lexicon()
+    token = normalize_token(word)
+    entry = exact.get(token)
+    if entry is None and prefixes:
+        # Longest matching prefix first
+        for length in range(len(token), 1, -1):
+            entry = prefixes.get(token[:length])
+            if entry is not None:
+                break
+    return entry
+
+
+def lexicon_words(text):
+    """Lexicon entries found in ``text``, one per occurrence."""
+    entries = map(lexicon_entry, token_pattern().findall(text))
+    return [entry for entry in entries if entry is not None]
+
+
+def score_news(news_items):
+    """
+    Score every item's title and description.
+
+    Returns:
+        ``(scores, labels)`` arrays: the mean weight of the lexicon words in each
+        item (0 when there are none) and -1/0/1 for negative/neutral/positive
+    """
+    entries, weights, _, _ = get_lexicon()
+    if not news_items:
+        return np.zeros(0), np.zeros(0, dtype=int)
+    vectorizer = CountVectorizer(analyzer=lexicon_words, vocabulary=entries)
+    counts = vectorizer.transform([news_text(news) for news in news_items])
+    totals = np.asarray(counts.sum(axis=1)).ravel()
+    net = counts @ weights
+    scores = np.divide(net, totals, out=np.zeros_like(net), where=totals > 0)
+    labels = np.where(scores > LABEL_THRESHOLD, 1, np.where(scores < -LABEL_THRESHOLD, -1, 0))
+    return scores, labels
+
+
+def _distribution(name, keys, scores, labels):
+    """Item counts per label and mean score for every distinct key, as rows sorted by key (stored under ``name``)."""
+    groups, inverse = np.unique(np.asarray(keys, dtype=str), return_inverse=True)
+    counts = np.bincount(inverse * 3 + labels + 1, minlength=len(groups) * 3).reshape(len(groups), 3)
+    sizes = counts.sum(axis=1)
+    means = np.bincount(inverse, weights=scores, minlength=len(groups)) / sizes
+    return [{name: str(group), "items": int(size), **{label: int(count) for label, count in zip(LABELS, row)},
+             "mean_score": round(float(mean), 3)}
+            for group, row, size, mean in zip(groups, counts, sizes, means)]
+
+
+def sentiment_report(news_items):
+    """
+    Score every item and aggregate the results.
+
+    Returns:
+        Dict with ``overall`` (label counts and mean score), ``by_source`` and
+        ``by_day`` (rows of label counts and mean score per source / publication
+        day, undated items under "undated"), plus the per-item ``scores`` and ``labels``
+    """
+    scores, labels = score_news(news_items)
+    if not news_items:
+        return {"overall": {"items": 0, **{label: 0 for label in LABELS}, "mean_score": 0.0}, "by_source": [], "by_day": [],
+                "scores": scores, "labels": labels}
+    overall = _distribution("all", np.zeros(len(news_items), dtype=int), scores, labels)[0]
+    del overall["all"]
+    by_source = _distribution("source", [news["source"] for news in news_items], scores, labels)
+    by_day = _distribution("day", [news["pub_date"].date().isoformat() if news.get("pub_date") else "undated"
+                                   for news in news_items], scores, labels)
+    return {"overall": overall, "by_source": by_source, "by_day": by_day, "scores": scores, "labels": labels}
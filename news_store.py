@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""Local SQLite store of ingested news items, written by news_ingest.py and read by the app."""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+STORE_PATH = os.getenv("NEWS_STORE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "news_store.sqlite"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS news (
+    hash TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    link TEXT,
+    description TEXT,
+    source TEXT,
+    language TEXT,
+    pub_date TEXT,
+    has_abusive INTEGER NOT NULL DEFAULT 0,
+    abusive_elements TEXT NOT NULL DEFAULT '[]',
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS news_language_date ON news (language, pub_date);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value REAL
+);
+"""
+
+# Full-text index over title and description. Combining marks are token characters,
+# so Devanagari and Kannada words are not split at every matra.
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS news_fts USING fts5(
+    title, description, content='news', content_rowid='rowid',
+    tokenize="unicode61 remove_diacritics 0 categories 'L* N* Co M*'"
+);
+CREATE TRIGGER IF NOT EXISTS news_fts_insert AFTER INSERT ON news BEGIN
+    INSERT INTO news_fts (rowid, title, description) VALUES (new.rowid, new.title, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS news_fts_delete AFTER DELETE ON news BEGIN
+    INSERT INTO news_fts (news_fts, rowid, title, description) VALUES ('delete', old.rowid, old.title, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS news_fts_update AFTER UPDATE OF title, description ON news BEGIN
+    INSERT INTO news_fts (news_fts, rowid, title, description) VALUES ('delete', old.rowid, old.title, old.description);
+    INSERT INTO news_fts (rowid, title, description) VALUES (new.rowid, new.title, new.description);
+END;
+"""
+
+_QUERY_TOKEN = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def build_fts_query(text):
+    """
+    Turn a user search string into a safe FTS5 query.
+
+    Terms are ANDed, ``"quoted words"`` match as a phrase and a trailing ``*``
+    makes a prefix query (``elect*`` matches "election", "electoral", ...).
+    Everything else is quoted, so FTS5 operators in the input are harmless.
+    """
+    parts = []
+    for phrase, term in _QUERY_TOKEN.findall(text or ""):
+        prefix = False
+        if term:
+            prefix = term.endswith("*")
+            phrase = term.rstrip("*")
+        phrase = phrase.replace('"', "").strip()
+        if phrase:
+            parts.append(f'"{phrase}"' + ("*" if prefix else ""))
+    return " ".join(parts)
+
+
+class NewsStore:
+    """News items keyed by their title hash, in a WAL-mode SQLite database."""
+
+    def __init__(self, path=STORE_PATH):
+        """
+        Open (or create) the store.
+
+        Args:
+            path: Location of the SQLite file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        # WAL lets the app read while the ingestion daemon writes
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        has_fts = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'news_fts'").fetchone()
+        self._conn.executescript(FTS_SCHEMA)
+        if not has_fts:
+            # Index rows stored before the full-text table existed
+            self._conn.execute("INSERT INTO news_fts (news_fts) VALUES ('rebuild')")
+        self._conn.commit()
+
+    def add_news(self, news_items, language):
+        """
+        Insert or refresh news items in a single transaction.
+
+        Args:
+            news_items: Items in the app's schema (title, link, description, source,
+                hash, has_abusive, abusive_elements, pub_date)
+            language: Language code the items were fetched for
+
+        Returns:
+            Number of items written
+        """
+        now = time.time()
+        rows = [(
+            news["hash"],
+            news["title"],
+            news.get("link", ""),
+            news.get("description", ""),
+            news.get("source", ""),
+            language,
+            news["pub_date"].isoformat() if news.get("pub_date") else None,
+            int(bool(news.get("has_abusive"))),
+            json.dumps(news.get("abusive_elements") or [], ensure_ascii=False),
+            now,
+            now,
+        ) for news in news_items]
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO news (hash, title, link, description, source, language, pub_date,"
+                " has_abusive, abusive_elements, first_seen, last_seen)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(hash) DO UPDATE SET"
+                " has_abusive = excluded.has_abusive,"
+                " abusive_elements = excluded.abusive_elements,"
+                " last_seen = excluded.last_seen",
+                rows,
+            )
+            self._conn.commit()
+        return len(rows)
+
+    @staticmethod
+    def _to_news(row):
+        news_hash, title, link, description, source, pub_date, has_abusive, abusive_elements = row
+        return {
+            "title": title,
+            "link": link,
+            "description": description,
+            "source": source,
+            "hash": news_hash,
+            "has_abusive": bool(has_abusive),
+            "abusive_elements": json.loads(abusive_elements),
+            "pub_date": datetime.fromisoformat(pub_date) if pub_date else None,
+        }
+
+    def get_news(self, language=None, since=None, until=None, search_keyword=None, limit=None, order="date"):
+        """
+        Return stored items, newest first.
+
+        Args:
+            language: Language code (None for every language)
+            since: Only items published at or after this datetime (undated items are always included)
+            until: Only items published before this datetime
+            search_keyword: Full-text query over title and description (see build_fts_query)
+            limit: Maximum number of items
+            order: "date" for newest first, "rank" for best full-text match first
+        """
+        query = ("SELECT news.hash, news.title, news.link, news.description, news.source, news.pub_date,"
+                 " news.has_abusive, news.abusive_elements FROM news")
+        conditions, params = [], []
+        fts_query = build_fts_query(search_keyword)
+        if fts_query:
+            query += " JOIN news_fts ON news_fts.rowid = news.rowid"
+            conditions.append("news_fts MATCH ?")
+            params.append(fts_query)
+        if language is not None:
+            conditions.append("news.language = ?")
+            params.append(language)
+        if since is not None:
+            conditions.append("(news.pub_date IS NULL OR news.pub_date >= ?)")
+            params.append(since.isoformat())
+        if until is not None:
+            conditions.append("news.pub_date < ?")
+            params.append(until.isoformat())
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        if fts_query and order == "rank":
+            query += " ORDER BY bm25(news_fts)"
+        else:
+            query += " ORDER BY news.pub_date IS NULL, news.pub_date DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [self._to_news(row) for row in rows]
+
+    def search_news(self, text, language=None, limit=50):
+        """Full-text search over the whole archive, best matches first."""
+        return self.get_news(language, search_keyword=text, limit=limit, order="rank")
+
+    def record_ingest(self, when=None):
+        """Mark an ingestion pass as finished at ``when`` (default now); only news_ingest.py calls this."""
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_ingest', ?)",
+                               (time.time() if when is None else when,))
+            self._conn.commit()
+
+    def last_ingest_time(self):
+        """Timestamp of the last finished ingestion pass, or None if the daemon never ran."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'last_ingest'").fetchone()
+        return row[0] if row else None
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM news").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Local topic clustering of fetched news.
+
+Items are hashed into sparse TF-IDF vectors over stemmed tokens and grouped
+with MiniBatchKMeans. New items update the vectors' IDF weights and nudge the
+existing cluster centres (partial_fit) instead of refitting everything, and
+clusters are labelled with their most distinctive terms.
+"""
+import math
+from collections import Counter
+
+import numpy as np
+from scipy.sparse import vstack
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS, HashingVectorizer
+from sklearn.preprocessing import normalize
+
+from keyword_matcher import normalize_token, token_pattern
+from news_recommender import STEM_LENGTH, news_text
+
+TOPIC_COUNT = 8
+# Fewer topics are used until there are this many items per topic
+MIN_TOPIC_SIZE = 5
+TOP_TERMS = 5
+N_FEATURES = 2 ** 16
+
+# Function words that would otherwise label every cluster
+STOP_WORDS = set(ENGLISH_STOP_WORDS) | set(
+    "के का की में है हैं और से को पर ने यह वह एक भी लिए कि तो था थे थी गया गई किया कर करने होगा रहे रहा "
+    "साथ बाद अब इस उस जो नहीं ही हो तक "
+    "ಮತ್ತು ಈ ಆ ಒಂದು ಎಂದು ಅವರು ಇದೆ ಹಾಗೂ ಮೇಲೆ ಎಂಬ ಇದು ಅದು ಬಗ್ಗೆ ನಂತರ ಈಗ".split()
+)
+
+
+def topic_tokens(text):
+    """Normalized word tokens of ``text`` without stop words, numbers and single letters."""
+    tokens = []
+    for word in token_pattern().findall(text):
+        token = normalize_token(word)
+        if len(token) > 1 and token not in STOP_WORDS and not token.isdigit():
+            tokens.append(token)
+    return tokens
+
+
+def stems(tokens):
+    return [token[:STEM_LENGTH] for token in tokens]
+
+
+class TopicModel:
+    """Incrementally updated clusters of news items, identified by their ``hash``."""
+
+    def __init__(self, n_topics=TOPIC_COUNT, seed=0):
+        """
+        Create an empty model.
+
+        Args:
+            n_topics: Number of clusters once there are enough items
+            seed: Random state of the clustering, for repeatable topics
+        """
+        self.n_topics = n_topics
+        self.seed = seed
+        self._vectorizer = HashingVectorizer(analyzer=stems, n_features=N_FEATURES, alternate_sign=False, norm=None)
+        self._hashes = []
+        self._index = {}
+        self._tokens = []
+        self._counts = None
+        self._df = np.zeros(N_FEATURES)
+        self._kmeans = None
+        self._labels = np.zeros(0, dtype=int)
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def _vectors(self):
+        # Sublinear term frequencies weighted by the current smoothed IDF, rows L2-normalised
+        idf = np.log((1 + len(self._hashes)) / (1 + self._df)) + 1
+        return normalize(self._counts.multiply(idf).tocsr())
+
+    def add(self, news_items):
+        """
+        Add the items not seen before and update the clusters.
+
+        Returns:
+            Number of items added
+        """
+        new_items = [news for news in news_items if news["hash"] not in self._index]
+        new_items = list({news["hash"]: news for news in new_items}.values())
+        if not new_items:
+            return 0
+
+        tokens = [topic_tokens(news_text(news)) for news in new_items]
+        counts = self._vectorizer.transform(tokens).tocsr()
+        counts.data = 1 + np.log(counts.data)
+        self._df += np.bincount(counts.indices, minlength=N_FEATURES)
+        for news in new_items:
+            self._index[news["hash"]] = len(self._hashes)
+            self._hashes.append(news["hash"])
+        self._tokens.extend(tokens)
+        self._counts = counts if self._counts is None else vstack([self._counts, counts]).tocsr()
+
+        vectors = self._vectors()
+        n_clusters = min(self.n_topics, max(1, len(self._hashes) // MIN_TOPIC_SIZE))
+        if self._kmeans is None or self._kmeans.n_clusters != n_clusters:
+            # Refit from scratch while the item count still changes the number of topics
+            self._kmeans = MiniBatchKMeans(n_clusters=n_clusters, random_state=self.seed, n_init=3,
+                                           batch_size=1024).fit(vectors)
+        else:
+            self._kmeans.partial_fit(vectors[-len(new_items):])
+        self._labels = self._kmeans.predict(vectors)
+        return len(new_items)
+
+    def topics(self, hashes=None, top_terms=TOP_TERMS):
+        """
+        Current clusters, largest first.
+
+        Args:
+            hashes: Only report these items (e.g. the news currently shown); None for every item
+            top_terms: Number of label terms per topic
+
+        Returns:
+            List of ``{"terms": [...], "hashes": [...]}`` dicts; terms are the words
+            most frequent in the topic relative to all reported items
+        """
+        if hashes is None:
+            indices = range(len(self._hashes))
+        else:
+            indices = [self._index[news_hash] for news_hash in dict.fromkeys(hashes) if news_hash in self._index]
+        members = {}
+        for index in indices:
+            members.setdefault(int(self._labels[index]), []).append(index)
+        if not members:
+            return []
+
+        document_frequency = Counter()
+        for index in indices:
+            document_frequency.update(set(self._tokens[index]))
+        n_items = sum(len(group) for group in members.values())
+
+        topics = []
+        for group in sorted(members.values(), key=len, reverse=True):
+            term_counts = Counter()
+            for index in group:
+                term_counts.update(set(self._tokens[index]))
+            scores = {term: count * math.log(1 + n_items / document_frequency[term])
+                      for term, count in term_counts.items() if count > 1 or len(group) == 1}
+            terms = sorted(scores, key=lambda term: (-scores[term], term))[:top_terms]
+            topics.append({"terms": terms, "hashes": [self._hashes[index] for index in group]})
+        return topics
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+PDF news reports. Styles are built once per process and flowables are produced
+lazily, so large reports render in bounded memory.
+"""
+import re
+from functools import lru_cache
+from io import BytesIO
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+from keyword_matcher import TokenMatcher, apply_spans, merge_spans
+from news_pipeline import find_abusive_spans
+
+LANGUAGE_NAMES = {"en": "English", "hi": "Hindi", "kn": "Kannada"}
+
+# Markup wrapped around highlighted spans, by span kind
+HIGHLIGHT_MARKUP = {
+    "keyword": '<font color="red"><b>{}</b></font>',
+    "search": '<font color="green"><b>{}</b></font>',
+}
+
+# Number of flowables pulled ahead of the layout engine
+STREAM_BUFFER = 64
+
+
+def escape_markup(text):
+    """Escape text for use inside a reportlab Paragraph."""
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+@lru_cache(maxsize=1)
+def get_report_styles():
+    """Build the report's paragraph styles once per process."""
+    styles = getSampleStyleSheet()
+    return {
+        "title": ParagraphStyle(
+            'TitleStyle',
+            parent=styles['Heading1'],
+            fontSize=16,
+            spaceAfter=12,
+            alignment=1  # Center alignment
+        ),
+        "subtitle": ParagraphStyle(
+            'SubtitleStyle',
+            parent=styles['Heading2'],
+            fontSize=14,
+            spaceAfter=10,
+            textColor=colors.blue
+        ),
+        "news": ParagraphStyle(
+            'NewsStyle',
+            parent=styles['Normal'],
+            fontSize=12,
+            spaceAfter=6
+        ),
+        "source": ParagraphStyle(
+            'SourceStyle',
+            parent=styles['Italic'],
+            fontSize=10,
+            textColor=colors.gray,
+            spaceAfter=12
+        ),
+        "link": ParagraphStyle(
+            'LinkStyle',
+            parent=styles['Normal'],
+            fontSize=10,
+            textColor=colors.blue,
+            spaceAfter=15
+        ),
+        "ai_warning": ParagraphStyle(
+            'AIWarningStyle',
+            parent=styles['Normal'],
+            fontSize=10,
+            textColor=colors.orange,
+            spaceAfter=8,
+            leftIndent=10,
+            borderWidth=0,
+            borderColor=colors.orange,
+            borderPadding=0,
+            borderRadius=0,
+            borderLeftWidth=2,
+            borderLeftColor=colors.orange,
+            borderLeftPadding=5
+        ),
+        "warning": ParagraphStyle(
+            'WarningStyle',
+            parent=styles['Normal'],
+            fontSize=12,
+            textColor=colors.red,
+            spaceAfter=12,
+            borderWidth=1,
+            borderColor=colors.red,
+            borderPadding=5,
+            borderRadius=5
+        ),
+        "analysis_title": ParagraphStyle(
+            'AnalysisTitleStyle', parent=styles['h2'], fontSize=14, spaceAfter=10, textColor=colors.darkgreen),
+        "analysis_body": ParagraphStyle(
+            'AnalysisBodyStyle', parent=styles['Normal'], fontSize=10, leading=13, spaceAfter=8,
+            leftIndent=10, rightIndent=10, alignment=4),
+    }
+
+
+class FlowableStream(list):
+    """
+    List facade over a flowable iterator for ``doc.build``.
+
+    reportlab consumes flowables from the front of the list it is given; this
+    keeps only a small window buffered and refills it from the iterator, so the
+    whole report never exists as flowables at once. Popping from the front of
+    a short list is also much cheaper than from a list of every flowable.
+    """
+
+    def __init__(self, flowables, buffer_size=STREAM_BUFFER):
+        super().__init__()
+        self._source = iter(flowables)
+        self._buffer_size = buffer_size
+        self._exhausted = False
+
+    def _fill(self):
+        if self._exhausted:
+            return
+        missing = self._buffer_size - list.__len__(self)
+        while missing > 0:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._exhausted = True
+                return
+            missing -= 1
+
+    def __len__(self):
+        self._fill()
+        return list.__len__(self)
+
+    def __getitem__(self, index):
+        self._fill()
+        return list.__getitem__(self, index)
+
+
+def highlighted_title(news, language, search_matcher=None):
+    """
+    Paragraph markup for a news title with abusive keywords in red and the search keyword in green.
+
+    Uses the item's precomputed ``keyword_spans`` when the pipeline provided them.
+    """
+    title = news["title"]
+    keyword_spans = news.get("keyword_spans")
+    if keyword_spans is None:
+        keyword_spans = find_abusive_spans(title, language)
+    spans = [tuple(span[:3]) + ("keyword",) for span in keyword_spans]
+    if search_matcher:
+        spans = merge_spans(spans, [span + ("search",) for span in search_matcher.find_spans(title)])
+    return apply_spans(title, spans, lambda matched, span: HIGHLIGHT_MARKUP[span[3]].format(escape_markup(matched)),
+                       escape=escape_markup)
+
+
+def iter_report_flowables(news_items, date_str, language, search_keyword=None, analysis_text=None):
+    """Yield the report's flowables one at a time."""
+    styles = get_report_styles()
+
+    # Add title
+    yield Paragraph(f"News Report - {escape_markup(date_str)}", styles["title"])
+    yield Paragraph(f"Language: {LANGUAGE_NAMES.get(language, 'Unknown')}", styles["subtitle"])
+
+    if search_keyword:
+        yield Paragraph(f"Keyword Search: '{escape_markup(search_keyword)}'", styles["subtitle"])
+
+    yield Spacer(1, 12)
+
+    # Add abusive content warning if needed
+    if any(news["has_abusive"] for news in news_items):
+        yield Paragraph("⚠️ WARNING: This report contains potentially sensitive content highlighted in red",
+                        styles["warning"])
+        yield Spacer(1, 12)
+
+    search_matcher = TokenMatcher([search_keyword]) if search_keyword else None
+
+    # Add news items
+    for i, news in enumerate(news_items, 1):
+        yield Paragraph(f"{i}. {highlighted_title(news, language, search_matcher)}", styles["news"])
+
+        # Add AI-detected abusive elements warning if any
+        if news.get("has_abusive") and news.get("abusive_elements"):
+            ai_warning = f"⚠️ AI detected potentially problematic content: {', '.join(news.get('abusive_elements', []))}"
+            yield Paragraph(escape_markup(ai_warning), styles["ai_warning"])
+
+        # Add publication date if available
+        if news.get("pub_date"):
+            yield Paragraph(f"Published: {news['pub_date'].strftime('%Y-%m-%d %H:%M')}", styles["source"])
+
+        yield Paragraph(f"Source: {escape_markup(news['source'])}", styles["source"])
+        yield Paragraph(f"<a href='{escape_markup(news['link'])}'>Read full article</a>", styles["link"])
+        yield Spacer(1, 10)
+
+    # Add AI Analysis if available
+    if analysis_text:
+        yield Spacer(1, 0.3*72)
+        yield Paragraph("Gemini AI Analysis", styles["analysis_title"])
+        yield Spacer(1, 0.1*72)
+        for para in analysis_text.split('\n'):
+            para_strip = para.strip()
+            if para_strip:
+                safe_para = escape_markup(para_strip)
+                safe_para = re.sub(r'\*\*(.*?)\*\*', r'<b>\1</b>', safe_para)
+                safe_para = re.sub(r'\*(.*?)\*', r'<i>\1</i>', safe_para)
+                safe_para = safe_para.replace('&lt;b&gt;', '<b>').replace('&lt;/b&gt;', '</b>').replace('&lt;i&gt;', '<i>').replace('&lt;/i&gt;', '</i>')
+                yield Paragraph(safe_para, styles["analysis_body"])
+
+
+def generate_pdf(news_items, date_str, language, search_keyword=None, analysis_text=None, output=None):
+    """
+    Generate a PDF report of news items with optional AI analysis.
+
+    Args:
+        news_items: Sequence of news items in the app's schema
+        date_str: Date shown in the report title
+        language: Language code of the items
+        search_keyword: Optional keyword to highlight
+        analysis_text: Optional Gemini analysis appended to the report
+        output: File path or binary file object to write to (default: a new BytesIO)
+
+    Returns:
+        The output object, rewound to the start when it is a BytesIO
+    """
+    buffer = BytesIO() if output is None else output
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    doc.build(FlowableStream(iter_report_flowables(news_items, date_str, language, search_keyword, analysis_text)))
+    if hasattr(buffer, "seek"):
+        buffer.seek(0)
+    return buffer
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""Concurrent crawler for Sarkari Pariksha current affairs pages over a date range."""
+import importlib.util
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+from news_fetch import FEED_TIMEOUT, MAX_FEED_WORKERS, get_session
+
+logger = logging.getLogger(__name__)
+
+SARKARI_URL = "https://sarkaripariksha.com/gk-and-current-affairs/{year}/{month}/{day}/{language}/"
+# Language codes used in the page URLs
+SARKARI_LANGUAGES = {"en": "1", "hi": "2"}
+# Matches the session's connection pool, so every worker keeps its connection alive
+MAX_CRAWL_WORKERS = MAX_FEED_WORKERS
+
+# lxml parses several times faster than the standard library parser when it is installed
+HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+
+def sarkari_url(language, year, month, day):
+    """
+    URL of one day's current affairs page.
+
+    Args:
+        language: "en" or "hi"
+        year: Year, e.g. "2025"
+        month: Lower-case English month name, e.g. "march"
+        day: Day of the month
+    """
+    return SARKARI_URL.format(year=year, month=month, day=day, language=SARKARI_LANGUAGES[language])
+
+
+def parse_sarkari_page(html):
+    """Return ``(title, link)`` pairs for the news boxes of a page."""
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    # Only build the tree for the news boxes instead of the whole page
+    boxes = SoupStrainer("div", class_="examlist-details-img-box")
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=boxes)
+    entries = []
+    for news_item in soup.find_all("div", class_="examlist-details-img-box"):
+        heading = news_item.find("h2")
+        a_tag = heading.find("a") if heading else None
+        if a_tag is None or not a_tag.get("href"):
+            continue
+        entries.append((a_tag.get_text(strip=True), a_tag["href"]))
+    return entries
+
+
+def fetch_sarkari_page(language, year, month, day, timeout=FEED_TIMEOUT):
+    """Download and parse one day's page over the shared keep-alive session."""
+    response = get_session().get(sarkari_url(language, year, month, day), timeout=timeout)
+    response.raise_for_status()
+    return parse_sarkari_page(response.content)
+
+
+def date_range(start, end):
+    """Every date from ``start`` to ``end``, both included."""
+    return [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+
+def iter_sarkari_pages(languages, start, end, max_workers=MAX_CRAWL_WORKERS, timeout=FEED_TIMEOUT):
+    """
+    Fetch every day/language page between two dates in parallel.
+
+    Args:
+        languages: Language codes to crawl (codes without Sarkari pages are ignored)
+        start: First date
+        end: Last date (included)
+        max_workers: Maximum number of pages downloaded at once
+        timeout: requests timeout for each page
+
+    Yields ``(language, date, entries, error)`` tuples in completion order.
+    Exactly one of ``entries``/``error`` is set.
+    """
+    pages = [(language, day) for day in date_range(start, end)
+             for language in languages if language in SARKARI_LANGUAGES]
+    if not pages:
+        return
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pages)))) as executor:
+        futures = {
+            executor.submit(fetch_sarkari_page, language, str(day.year), day.strftime("%B").lower(), day.day,
+                            timeout): (language, day)
+            for language, day in pages
+        }
+        for future in as_completed(futures):
+            language, day = futures[future]
+            try:
+                yield language, day, future.result(), None
+            except Exception as e:
+                logger.warning(f"Error downloading Sarkari Pariksha {language} page for {day}: {e}")
+                yield language, day, None, e